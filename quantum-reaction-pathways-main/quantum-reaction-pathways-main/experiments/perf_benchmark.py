@@ -0,0 +1,313 @@
+"""
+Performance benchmark for the propagation engines.
+
+Times the reference expm loop against the spectral, stepping, Krylov
+and batched engines over a matrix of Hamiltonian sizes, batch sizes and
+time-grid lengths, recording wall time, throughput (trajectory points
+per second), peak traced memory and the maximum population error
+against the reference. Results are written as JSON and can be compared
+against a saved baseline:
+
+    python -m experiments.perf_benchmark --output bench.json
+    python -m experiments.perf_benchmark --baseline bench.json
+
+The process exits with status 1 when any case regresses.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import scipy
+
+from hamiltonians.qenzyme import QEnzyme
+from hamiltonians.reaction_chain import ReactionChain
+from simulator.simulate import PROPAGATORS
+
+ENGINES = ("expm", "spectral", "stepping", "krylov", "batch")
+SIZES = (4, 64, 512)
+BATCHES = (1, 1000, 10000)
+GRIDS = (300, 3000)
+
+# Batch cases whose (B, T, 4) float64 result exceeds this are skipped.
+MEMORY_BUDGET_MB = 2048
+
+# Skip the expm reference beyond ~n^3 * T flops; spectral (exact to
+# machine precision) is the reference instead.
+REFERENCE_MAX_COST = 2e10
+# Candidates propagated one by one with expm when checking batch accuracy.
+BATCH_REFERENCE_CANDIDATES = 8
+LOOP_MAX_BATCH = 100
+
+TIME_TOLERANCE = 0.25
+ERROR_TOLERANCE = 1e-8
+
+
+def chain(n_states):
+    """Barrier chain with QEnzyme's 4-site profile resampled to ``n_states``."""
+
+    return ReactionChain.from_profile(
+        [0, 1, 2, 3], [0.0, 2.0, 2.0, -1.0], n_states, environment=0.1
+    )
+
+
+def batch_parameters(n_batch, seed=0):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.uniform(0.1, 2.0, n_batch),
+        rng.uniform(0.0, 2.0, n_batch),
+        rng.uniform(0.0, 1.0, n_batch),
+        rng.uniform(0.0, 0.5, n_batch),
+    )
+
+
+def expm_loop(params, times):
+    psi0 = np.array([1, 0, 0, 0], dtype=complex)
+    H = QEnzyme.batch_hamiltonian(*params)
+    return np.stack([PROPAGATORS["expm"](h, times, psi0) for h in H])
+
+
+def measure(run, repeat, error):
+    """
+    Best-of-``repeat`` wall time, plus ``error(result)`` and peak memory
+    of one run.
+
+    The traced result is dropped before the timed repeats, so at most
+    one result is alive at a time.
+    """
+
+    tracemalloc.start()
+    result = run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    max_error = error(result)
+    del result
+
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    return best, max_error, peak / 1024 ** 2
+
+
+def single_cases(engines, sizes, grids, repeat):
+    for n_states in sizes:
+        model = chain(n_states)
+        H_sparse = model.hamiltonian()
+        H = H_sparse.toarray()
+        psi0 = model.initial_state()
+
+        for n_times in grids:
+            times = np.linspace(0, 10, n_times)
+            use_expm = n_states ** 3 * n_times <= REFERENCE_MAX_COST
+            reference_name = "expm" if use_expm else "spectral"
+            reference = PROPAGATORS[reference_name](H, times, psi0)
+
+            for engine in engines:
+                if engine == "batch" or (engine == "expm" and not use_expm):
+                    continue
+                operator = H_sparse if engine == "krylov" else H
+                seconds, error, peak = measure(
+                    lambda: PROPAGATORS[engine](operator, times, psi0),
+                    repeat,
+                    lambda pop: np.abs(pop - reference).max(),
+                )
+                yield record(
+                    "single", engine, n_states, n_times, 1, seconds, peak,
+                    error, reference_name,
+                )
+
+
+def batch_cases(
+    engines, batches, grids, repeat, memory_budget_mb=MEMORY_BUDGET_MB
+):
+    for n_batch in batches:
+        params = batch_parameters(n_batch)
+        head = tuple(p[:BATCH_REFERENCE_CANDIDATES] for p in params)
+
+        for n_times in grids:
+            result_mb = n_batch * n_times * 4 * 8 / 1024 ** 2
+            if result_mb > memory_budget_mb:
+                print(
+                    f"Skipping B={n_batch}, T={n_times}: result needs "
+                    f"{result_mb:.0f} MB (budget {memory_budget_mb} MB)",
+                    file=sys.stderr,
+                )
+                continue
+
+            times = np.linspace(0, 10, n_times)
+            reference = expm_loop(head, times)
+
+            def error(pop):
+                return np.abs(pop[:len(reference)] - reference).max()
+
+            if "expm" in engines and n_batch <= LOOP_MAX_BATCH:
+                seconds, max_error, peak = measure(
+                    lambda: expm_loop(params, times), repeat, error
+                )
+                yield record(
+                    "batch", "expm", 4, n_times, n_batch, seconds, peak,
+                    max_error, "expm",
+                )
+
+            if "batch" in engines:
+                # Every run writes into the same output, so peak memory
+                # is the working set plus one result.
+                out = np.empty((n_batch, n_times, 4))
+                seconds, max_error, peak = measure(
+                    lambda: QEnzyme.simulate_batch(
+                        *params, times=times, out=out
+                    ),
+                    repeat,
+                    error,
+                )
+                del out
+                yield record(
+                    "batch", "batch", 4, n_times, n_batch, seconds,
+                    peak + result_mb, max_error, "expm",
+                )
+
+
+def record(
+    suite, engine, n_states, n_times, n_batch, seconds, peak, error, reference
+):
+    return {
+        "suite": suite,
+        "engine": engine,
+        "n_states": n_states,
+        "n_times": n_times,
+        "batch": n_batch,
+        "seconds": seconds,
+        "points_per_second": n_batch * n_times / seconds,
+        "peak_mb": peak,
+        "max_error": float(error),
+        "reference": reference,
+    }
+
+
+def case_key(result):
+    return (
+        result["suite"],
+        result["engine"],
+        result["n_states"],
+        result["n_times"],
+        result["batch"],
+    )
+
+
+def compare(results, baseline, tolerance=TIME_TOLERANCE):
+    """
+    Cases that got slower than ``tolerance`` or lost accuracy.
+
+    Returns a list of ``(result, baseline_result, reasons)``.
+    """
+
+    previous = {case_key(r): r for r in baseline["results"]}
+    regressions = []
+
+    for result in results:
+        base = previous.get(case_key(result))
+        if base is None:
+            continue
+
+        reasons = []
+        if result["seconds"] > base["seconds"] * (1 + tolerance):
+            reasons.append(
+                f"time {base['seconds']:.4g}s -> {result['seconds']:.4g}s"
+            )
+        if result["max_error"] > max(base["max_error"], ERROR_TOLERANCE):
+            reasons.append(
+                f"error {base['max_error']:.2e} -> {result['max_error']:.2e}"
+            )
+        if reasons:
+            regressions.append((result, base, reasons))
+
+    return regressions
+
+
+def environment():
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def print_table(results):
+    print(
+        f"{'suite':<7}{'engine':<10}{'N':>6}{'T':>7}{'B':>8}"
+        f"{'seconds':>11}{'points/s':>12}{'peak MB':>10}{'max err':>10}"
+    )
+    for r in results:
+        print(
+            f"{r['suite']:<7}{r['engine']:<10}{r['n_states']:>6}"
+            f"{r['n_times']:>7}{r['batch']:>8}{r['seconds']:>11.4g}"
+            f"{r['points_per_second']:>12.3g}{r['peak_mb']:>10.1f}"
+            f"{r['max_error']:>10.1e}"
+        )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--engines", nargs="+", default=ENGINES, choices=ENGINES)
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--batches", nargs="+", type=int, default=BATCHES)
+    parser.add_argument("--grids", nargs="+", type=int, default=GRIDS)
+    parser.add_argument(
+        "--memory-budget",
+        type=float,
+        default=MEMORY_BUDGET_MB,
+        help="skip batch cases whose result exceeds this many MB",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=TIME_TOLERANCE)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    results = list(
+        single_cases(args.engines, args.sizes, args.grids, args.repeat)
+    ) + list(
+        batch_cases(
+            args.engines, args.batches, args.grids, args.repeat,
+            args.memory_budget,
+        )
+    )
+
+    print_table(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+
+        if regressions:
+            print(f"\n{len(regressions)} regression(s):")
+            for result, _, reasons in regressions:
+                print(f"  {' / '.join(map(str, case_key(result)))}: {'; '.join(reasons)}")
+            return 1
+        print("\nNo regressions against baseline.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.linalg import expm
 
 from hamiltonians.qenzyme import QEnzyme
+from simulator.simulate import simulate
 
 enzyme = QEnzyme(
     tunneling_strength=1.2,
@@ -19,14 +19,7 @@ psi0 = np.zeros(4, dtype=complex)
 psi0[0] = 1.0  # reactant
 
 times = np.linspace(0, 10, 200)
-populations = []
-
-for t in times:
-    U = expm(-1j * H * t)
-    psi_t = U @ psi0
-    populations.append(np.abs(psi_t)**2)
-
-populations = np.array(populations)
+populations = simulate(H, times, psi0)
 
 state_labels = {
     0: "Reactant (|0⟩)",
@@ -1,20 +1,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.linalg import expm
 
 from hamiltonians.qenzyme import QEnzyme
 
-def simulate(H, psi0, times):
-    populations = []
-    for t in times:
-        U = expm(-1j * H * t)
-        psi_t = U @ psi0
-        populations.append(np.abs(psi_t)**2)
-    return np.array(populations)
-
-psi0 = np.zeros(4, dtype=complex)
-psi0[0] = 1.0  # Reactant |0⟩
-
 times = np.linspace(0, 10, 300)
 
 qenzymes = {
@@ -44,12 +32,17 @@ qenzymes = {
     ),
 }
 
-results = {}
+params = [enzyme.summary() for enzyme in qenzymes.values()]
+
+populations = QEnzyme.simulate_batch(
+    tunneling=[p["tunneling"] for p in params],
+    product_stabilization=[p["product_bias"] for p in params],
+    ts_stabilization=[p["ts_stabilization"] for p in params],
+    environment=[p["environment"] for p in params],
+    times=times,
+)
 
-for name, enzyme in qenzymes.items():
-    H = enzyme.hamiltonian()
-    pop = simulate(H, psi0, times)
-    results[name] = pop
+results = dict(zip(qenzymes, populations))
 
 efficiency = {
     name: pop[-1, 3]   # final product population
@@ -1,16 +1,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.linalg import expm
 
 from hamiltonians.qenzyme import QEnzyme
-
-def simulate(H, psi0, times):
-    populations = []
-    for t in times:
-        U = expm(-1j * H * t)
-        psi_t = U @ psi0
-        populations.append(np.abs(psi_t)**2)
-    return np.array(populations)
+from simulator.simulate import simulate
 
 psi0 = np.zeros(4, dtype=complex)
 psi0[0] = 1.0  # Reactant |0⟩
@@ -25,7 +17,7 @@ enzyme_A = QEnzyme(
 )
 
 H_A = enzyme_A.hamiltonian()
-pop_A = simulate(H_A, psi0, times)
+pop_A = simulate(H_A, times, psi0)
 
 enzyme_B = QEnzyme(
     tunneling_strength=0.8,      # weaker tunneling
@@ -35,7 +27,7 @@ enzyme_B = QEnzyme(
 )
 
 H_B = enzyme_B.hamiltonian()
-pop_B = simulate(H_B, psi0, times)
+pop_B = simulate(H_B, times, psi0)
 
 plt.figure(figsize=(8, 5))
 
@@ -1,7 +1,8 @@
 import numpy as np
-from scipy.linalg import expm
 import matplotlib.pyplot as plt
 
+from simulator.simulate import simulate
+
 def build_hamiltonian(tunnel=1.0, bias=0.0):
     """
     tunnel : controls tunneling strength (barrier height)
@@ -31,14 +32,7 @@ psi0 = np.zeros(4, dtype=complex)
 psi0[0] = 1.0
 
 times = np.linspace(0, 10, 200)
-populations = []
-
-for t in times:
-    U = expm(-1j * H * t)
-    psi_t = U @ psi0
-    populations.append(np.abs(psi_t)**2)
-
-populations = np.array(populations)
+populations = simulate(H, times, psi0)
 
 plt.figure(figsize=(8, 5))
 for i in range(4):
@@ -1,5 +1,37 @@
 import numpy as np
-from scipy.linalg import expm
+
+from simulator.averages import long_time_populations, window_populations
+from simulator.batch import (
+    SINGLE_TOLERANCE,
+    chunk_size_for,
+    iter_chunks,
+    propagate_checked,
+    resolve_precision,
+)
+from simulator.cache import default_cache
+from simulator.disorder import simulate_ensemble
+from simulator.driven import driven_propagate
+from simulator.events import crossing_times
+from simulator.instrumentation import stage
+from simulator.result import SimulationResult
+from simulator.lindblad import (
+    environment_channels,
+    simulate_open,
+    simulate_open_batch,
+)
+from simulator.simulate import (
+    resolve_method,
+    simulate,
+    simulate_stream,
+    spectral_propagate,
+)
+
+PARAMETER_BOUNDS = {
+    "tunneling": (0.1, 2.0),
+    "product_bias": (0.0, 2.0),
+    "ts_stabilization": (0.0, 1.0),
+    "environment": (0.0, 0.5),
+}
 
 
 class QEnzyme:
@@ -70,24 +102,494 @@ class QEnzyme:
         self._H = None
     def hamiltonian(self):
         if self._H is None:
-            self._H = (
-                self.kinetic_term()
-                + self.potential_term()
-                + self.environment_term()
-            )
+            with stage("hamiltonian"):
+                self._H = (
+                    self.kinetic_term()
+                    + self.potential_term()
+                    + self.environment_term()
+                )
         return self._H
 
-    def simulate(self, times):
+    def cache_key(self):
+        return tuple(self.summary().values())
+
+    def eigensystem(self, cache=default_cache):
+        if cache is None:
+            return np.linalg.eigh(self.hamiltonian())
+        return cache.eigensystem(self.cache_key(), self.hamiltonian())
+
+    def simulate(self, times, method="auto", cache=default_cache, copy=True):
+        """
+        Populations over ``times``, shape (T, 4).
+
+        Spectral runs are served from ``cache``, whose arrays are shared
+        and read-only; a writable copy is returned unless ``copy=False``
+        asks for the cached array itself.
+        """
+
+        H = self.hamiltonian()
+        psi0 = np.array([1, 0, 0, 0], dtype=complex)
+
+        if cache is None or resolve_method(H, times, method) != "spectral":
+            return simulate(H, times, psi0, method=method)
+
+        def compute():
+            with stage("simulate.spectral"):
+                return spectral_propagate(
+                    H, times, psi0, eigensystem=self.eigensystem(cache)
+                )
+
+        populations = cache.populations(self.cache_key(), times, compute)
+        return populations.copy() if copy else populations
+
+    def result(self, times=None, cache=default_cache):
+        """
+        Lazy ``SimulationResult`` of this enzyme.
+
+        Only the (cached) eigendecomposition is computed up front;
+        populations, coherences and metrics follow on demand.
+        """
+
+        psi0 = np.array([1, 0, 0, 0], dtype=complex)
+        return SimulationResult(
+            *self.eigensystem(cache), psi0, times=times, params=self.summary()
+        )
+
+    def average_populations(self, window=None, cache=default_cache):
+        """
+        Grid-free averaged populations of the 4 sites.
+
+        ``window=None`` gives the infinite-time (diagonal ensemble)
+        average, ``window=(t0, t1)`` the exact mean over that window.
+        """
+
+        psi0 = np.array([1, 0, 0, 0], dtype=complex)
+        eigensystem = self.eigensystem(cache)
+        if window is None:
+            return long_time_populations(eigensystem, psi0)
+        return window_populations(eigensystem, psi0, *window)
+
+    def simulate_ensemble(
+        self,
+        times,
+        n_realizations=1000,
+        site_sigma=None,
+        coupling_sigma=0.0,
+        distribution="normal",
+        seed=0,
+        **options,
+    ):
+        """
+        Static-disorder ensemble of this enzyme.
+
+        By default the transition-state site energies fluctuate with a
+        width equal to ``environment_perturbation``, the static
+        counterpart of the environment term; pass ``site_sigma`` (scalar
+        or per site) and ``coupling_sigma`` to override. Remaining
+        options go to ``simulator.disorder.simulate_ensemble``.
+        """
+
+        if site_sigma is None:
+            site_sigma = np.diag(self.environment_term())
+        psi0 = np.array([1, 0, 0, 0], dtype=complex)
+        return simulate_ensemble(
+            self.hamiltonian(),
+            times,
+            psi0,
+            n_realizations=n_realizations,
+            site_sigma=site_sigma,
+            coupling_sigma=coupling_sigma,
+            distribution=distribution,
+            seed=seed,
+            **options,
+        )
+
+    def simulate_driven(self, times, drives, substeps=1, order=4, period=None):
+        """
+        Populations with time-dependent parameters p(t) = p + f(t).
+
+        ``drives`` maps ``PARAMETER_BOUNDS`` names to drive functions,
+        e.g. ``{"ts_stabilization": gaussian_pulse(...)}`` for a pulse on
+        the transition-state sites or ``{"environment": cosine_drive(...)}``
+        for a fluctuating environment. Remaining arguments are those of
+        ``simulator.driven.driven_propagate``.
+        """
+
+        psi0 = np.array([1, 0, 0, 0], dtype=complex)
+        return driven_propagate(
+            self.hamiltonian(),
+            self.drive_terms(drives),
+            times,
+            psi0,
+            substeps=substeps,
+            order=order,
+            period=period,
+        )
+
+    def jump_operators(
+        self, dephasing_scale=1.0, relaxation_scale=0.5, temperature=0.0
+    ):
+        return environment_channels(
+            self.hamiltonian(),
+            self.env,
+            dephasing_scale=dephasing_scale,
+            relaxation_scale=relaxation_scale,
+            temperature=temperature,
+        )
+
+    def simulate_open(self, times, **channels):
+        """
+        Lindblad evolution with dephasing and relaxation set by ``env``.
+
+        Keyword arguments are forwarded to
+        ``simulator.lindblad.environment_channels``.
+        """
+
+        psi0 = np.array([1, 0, 0, 0], dtype=complex)
+        return simulate_open(
+            self.hamiltonian(), times, psi0, self.jump_operators(**channels)
+        )
+
+    def simulate_stream(self, times, chunk_size=4096, method="auto"):
         H = self.hamiltonian()
         psi0 = np.array([1, 0, 0, 0], dtype=complex)
 
-        populations = []
-        for t in times:
-            U = expm(-1j * H * t)
-            psi_t = U @ psi0
-            populations.append(np.abs(psi_t) ** 2)
+        return simulate_stream(
+            H, times, psi0, chunk_size=chunk_size, method=method
+        )
+
+    @staticmethod
+    def batch_parameters(
+        tunneling,
+        product_stabilization=0.0,
+        ts_stabilization=0.0,
+        environment=0.0,
+    ):
+        return np.broadcast_arrays(
+            np.asarray(tunneling, dtype=float),
+            np.asarray(product_stabilization, dtype=float),
+            np.asarray(ts_stabilization, dtype=float),
+            np.asarray(environment, dtype=float),
+        )
+
+    @staticmethod
+    def batch_hamiltonian(
+        tunneling,
+        product_stabilization=0.0,
+        ts_stabilization=0.0,
+        environment=0.0,
+    ):
+        """
+        Stacked (B, 4, 4) Hamiltonians for arrays of parameters.
+
+        Same terms as ``hamiltonian()``, assembled for every parameter set
+        at once; scalar arguments are broadcast against the arrays.
+        """
+
+        t, bias, ts, env = (
+            np.ravel(p) for p in QEnzyme.batch_parameters(
+                tunneling, product_stabilization, ts_stabilization, environment
+            )
+        )
+
+        H = np.zeros((t.size, 4, 4))
+        for i in range(3):
+            H[:, i, i + 1] = -t
+            H[:, i + 1, i] = -t
+
+        H[:, 1, 1] = 2.0 - ts + env
+        H[:, 2, 2] = 2.0 - ts + env
+        H[:, 3, 3] = -bias
+        return H
+
+    @staticmethod
+    def hamiltonian_derivatives():
+        """
+        dH/dp for each parameter, stacked as (4, 4, 4).
+
+        Ordered like ``summary()``. H is linear in every parameter, so
+        the derivatives are constant and read off ``batch_hamiltonian``.
+        """
+
+        return (
+            QEnzyme.batch_hamiltonian(*np.eye(4))
+            - QEnzyme.batch_hamiltonian(0.0)
+        )
+
+    @staticmethod
+    def drive_terms(drives):
+        """
+        ``(dH/dp, f)`` pairs for a mapping of parameter name -> drive.
+
+        H is linear in every parameter, so driving p(t) = p + f(t) adds
+        f(t) dH/dp to the static Hamiltonian.
+        """
+
+        derivatives = dict(
+            zip(PARAMETER_BOUNDS, QEnzyme.hamiltonian_derivatives())
+        )
+        unknown = set(drives) - set(derivatives)
+        if unknown:
+            raise ValueError(
+                f"Unknown drive parameter(s) {sorted(unknown)}. "
+                f"Choose from: {', '.join(derivatives)}"
+            )
+        return [(derivatives[name], f) for name, f in drives.items()]
+
+    @classmethod
+    def simulate_batch(
+        cls,
+        tunneling,
+        product_stabilization=0.0,
+        ts_stabilization=0.0,
+        environment=0.0,
+        times=None,
+        chunk_size=None,
+        out=None,
+        precision="double",
+        tolerance=SINGLE_TOLERANCE,
+    ):
+        """
+        Simulate many parameter sets with batched eigendecompositions.
+
+        Hamiltonians are assembled and diagonalized chunk by chunk, so
+        memory stays bounded for B in the 10^5-10^6 range. Pass an
+        ``np.memmap`` as ``out`` when the (B, T, 4) result itself does
+        not fit in RAM. ``precision="single"`` propagates in complex64
+        and returns float32, with every chunk spot-checked against
+        double precision to ``tolerance`` (see
+        ``simulator.batch.propagate_checked``).
+
+        Returns
+        -------
+        populations : np.ndarray
+            Array of shape (B, T, 4)
+        """
+
+        params = [
+            np.ravel(p) for p in cls.batch_parameters(
+                tunneling, product_stabilization, ts_stabilization, environment
+            )
+        ]
+        if times is None:
+            times = np.linspace(0, 10, 300)
+
+        real, complex_ = resolve_precision(precision)
+        n_batch, n_times = params[0].size, len(times)
+        if chunk_size is None:
+            # Reduced precision halves the bytes per candidate.
+            chunk_size = chunk_size_for(n_times, 4) * (
+                16 // np.dtype(complex_).itemsize
+            )
+        if out is None:
+            out = np.empty((n_batch, n_times, 4), dtype=real)
+
+        psi0 = np.array([1, 0, 0, 0], dtype=complex)
+        for start, stop in iter_chunks(n_batch, chunk_size):
+            with stage("simulate_batch", items=stop - start):
+                H = cls.batch_hamiltonian(*(p[start:stop] for p in params))
+                out[start:stop] = propagate_checked(
+                    H, times, psi0, precision, tolerance
+                )
+
+        return out
+
+    @classmethod
+    def result_batch(
+        cls,
+        tunneling,
+        product_stabilization=0.0,
+        ts_stabilization=0.0,
+        environment=0.0,
+        times=None,
+    ):
+        """
+        Batched lazy ``SimulationResult`` from one stacked ``eigh``.
+
+        Keeps O(B N^2) memory until populations are requested, so
+        screens that read a few metrics per candidate never hold the
+        (B, T, 4) trajectories.
+        """
+
+        params = [
+            np.ravel(p) for p in cls.batch_parameters(
+                tunneling, product_stabilization, ts_stabilization, environment
+            )
+        ]
+        psi0 = np.array([1, 0, 0, 0], dtype=complex)
+        return SimulationResult.from_hamiltonian(
+            cls.batch_hamiltonian(*params),
+            psi0,
+            times=times,
+            params=dict(zip(PARAMETER_BOUNDS, params)),
+        )
+
+    @classmethod
+    def average_populations_batch(
+        cls,
+        tunneling,
+        product_stabilization=0.0,
+        ts_stabilization=0.0,
+        environment=0.0,
+        window=None,
+        chunk_size=65536,
+    ):
+        """
+        Averaged populations for many parameter sets without a time grid.
+
+        One batched eigendecomposition per chunk replaces the (B, T, 4)
+        trajectory; see ``average_populations`` for ``window``.
+
+        Returns
+        -------
+        populations : np.ndarray
+            Array of shape (B, 4)
+        """
+
+        params = [
+            np.ravel(p) for p in cls.batch_parameters(
+                tunneling, product_stabilization, ts_stabilization, environment
+            )
+        ]
+        out = np.empty((params[0].size, 4))
+
+        psi0 = np.array([1, 0, 0, 0], dtype=complex)
+        for start, stop in iter_chunks(out.shape[0], chunk_size):
+            H = cls.batch_hamiltonian(*(p[start:stop] for p in params))
+            eigensystem = np.linalg.eigh(H)
+            if window is None:
+                out[start:stop] = long_time_populations(eigensystem, psi0)
+            else:
+                out[start:stop] = window_populations(eigensystem, psi0, *window)
+
+        return out
+
+    @classmethod
+    def threshold_times(
+        cls,
+        tunneling,
+        product_stabilization=0.0,
+        ts_stabilization=0.0,
+        environment=0.0,
+        threshold=0.4,
+        t_max=10.0,
+        chunk_size=4096,
+    ):
+        """
+        Exact first times the product population reaches ``threshold``.
+
+        Solved on the analytic spectral population with
+        ``simulator.events.crossing_times`` instead of a time grid;
+        ``np.inf`` for candidates that do not react within ``t_max``.
+        """
+
+        params = [
+            np.ravel(p) for p in cls.batch_parameters(
+                tunneling, product_stabilization, ts_stabilization, environment
+            )
+        ]
+        out = np.empty(params[0].size)
+
+        psi0 = np.array([1, 0, 0, 0], dtype=complex)
+        for start, stop in iter_chunks(out.size, chunk_size):
+            with stage("threshold_times", items=stop - start):
+                H = cls.batch_hamiltonian(*(p[start:stop] for p in params))
+                out[start:stop] = crossing_times(
+                    H, psi0, threshold=threshold, t_max=t_max
+                )
+
+        return out
+
+    @classmethod
+    def simulate_driven_batch(
+        cls,
+        tunneling,
+        product_stabilization=0.0,
+        ts_stabilization=0.0,
+        environment=0.0,
+        drives=None,
+        times=None,
+        substeps=1,
+        order=4,
+        period=None,
+        chunk_size=None,
+        out=None,
+    ):
+        """
+        Driven populations for many parameter sets.
+
+        Every candidate shares ``drives`` (see ``simulate_driven``);
+        step propagators of a chunk come from one batched ``eigh``, and
+        a ``period`` lets them be computed once per period and reused.
+
+        Returns
+        -------
+        populations : np.ndarray
+            Array of shape (B, T, 4)
+        """
+
+        params = [
+            np.ravel(p) for p in cls.batch_parameters(
+                tunneling, product_stabilization, ts_stabilization, environment
+            )
+        ]
+        if times is None:
+            times = np.linspace(0, 10, 300)
+
+        psi0 = np.array([1, 0, 0, 0], dtype=complex)
+        return driven_propagate(
+            cls.batch_hamiltonian(*params),
+            cls.drive_terms(drives or {}),
+            times,
+            psi0,
+            substeps=substeps,
+            order=order,
+            period=period,
+            chunk_size=chunk_size,
+            out=out,
+        )
+
+    @classmethod
+    def simulate_open_batch(
+        cls,
+        tunneling,
+        product_stabilization=0.0,
+        ts_stabilization=0.0,
+        environment=0.0,
+        times=None,
+        chunk_size=None,
+        out=None,
+        **channels,
+    ):
+        """
+        Batched Lindblad evolution of many parameter sets.
+
+        One (B, 16, 16) superoperator stack is diagonalized per chunk.
+
+        Returns
+        -------
+        populations : np.ndarray
+            Array of shape (B, T, 4)
+        """
+
+        t, bias, ts, env = (
+            np.ravel(p) for p in cls.batch_parameters(
+                tunneling, product_stabilization, ts_stabilization, environment
+            )
+        )
+        if times is None:
+            times = np.linspace(0, 10, 300)
+
+        H = cls.batch_hamiltonian(t, bias, ts, env)
+
+        def jump_ops(start, stop):
+            return environment_channels(H[start:stop], env[start:stop], **channels)
+
+        psi0 = np.array([1, 0, 0, 0], dtype=complex)
+        return simulate_open_batch(
+            H, times, psi0, jump_ops, chunk_size=chunk_size, out=out
+        )
 
-        return np.array(populations)
     def summary(self):
         return {
             "tunneling": self.tunnel,
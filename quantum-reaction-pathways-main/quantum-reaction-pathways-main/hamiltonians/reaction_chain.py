@@ -0,0 +1,136 @@
+import numpy as np
+from scipy import sparse
+from scipy.linalg import eigh_tridiagonal
+
+from simulator.simulate import (
+    krylov_propagate,
+    product_population,
+    spectral_propagate,
+)
+
+TRIDIAGONAL_MAX_SITES = 4000
+
+
+class ReactionChain:
+    """
+    N-site quantum reaction coordinate.
+
+    Generalizes QEnzyme's 4-site chain to an arbitrary number of sites:
+    the on-site energies are given as a potential profile (e.g. a barrier
+    sampled from QM/MM energies), neighbouring sites are coupled by the
+    tunneling strength, and the product is a region of site indices.
+    The Hamiltonian is tridiagonal and is only stored as its diagonal
+    and off-diagonal bands.
+    """
+
+    def __init__(
+        self,
+        potential,
+        tunneling=1.0,
+        environment=0.0,
+        environment_profile=None,
+        product_sites=None,
+        reactant_site=0,
+    ):
+        self.potential = np.asarray(potential, dtype=float)
+        n_sites = self.potential.size
+        if n_sites < 2:
+            raise ValueError("A reaction chain needs at least two sites")
+
+        self.tunnel = np.broadcast_to(
+            np.asarray(tunneling, dtype=float), (n_sites - 1,)
+        )
+        self.env = environment
+
+        if environment_profile is None:
+            environment_profile = np.ones(n_sites)
+            environment_profile[[0, -1]] = 0.0
+        self.environment_profile = np.asarray(environment_profile, dtype=float)
+
+        self.product_sites = (
+            (n_sites - 1,) if product_sites is None else tuple(product_sites)
+        )
+        self.reactant_site = reactant_site
+
+        self._eig = None
+
+    @classmethod
+    def from_qenzyme(cls, enzyme):
+        return cls(
+            potential=np.diag(enzyme.potential_term()),
+            tunneling=enzyme.tunnel,
+            environment=enzyme.env,
+        )
+
+    @classmethod
+    def from_profile(cls, coordinates, energies, n_sites, **kwargs):
+        """
+        Chain with ``n_sites`` sites from a sampled energy profile.
+
+        ``energies`` sampled at reaction ``coordinates`` (e.g. a QM/MM
+        scan) are linearly interpolated onto an evenly spaced chain.
+        """
+
+        coordinates = np.asarray(coordinates, dtype=float)
+        sites = np.linspace(coordinates.min(), coordinates.max(), n_sites)
+        return cls(potential=np.interp(sites, coordinates, energies), **kwargs)
+
+    @property
+    def n_sites(self):
+        return self.potential.size
+
+    def diagonal(self):
+        return self.potential + self.env * self.environment_profile
+
+    def off_diagonal(self):
+        return -self.tunnel
+
+    def hamiltonian(self, format="csr"):
+        return sparse.diags(
+            [self.off_diagonal(), self.diagonal(), self.off_diagonal()],
+            offsets=[-1, 0, 1],
+            format=format,
+        )
+
+    def eigensystem(self):
+        if self._eig is None:
+            self._eig = eigh_tridiagonal(self.diagonal(), self.off_diagonal())
+        return self._eig
+
+    def initial_state(self):
+        psi0 = np.zeros(self.n_sites, dtype=complex)
+        psi0[self.reactant_site] = 1.0
+        return psi0
+
+    def simulate(self, times, method="auto"):
+        """
+        Populations of every site over ``times``.
+
+        ``method="tridiagonal"`` diagonalizes the bands with
+        ``eigh_tridiagonal``; ``"krylov"`` applies the sparse operator
+        with ``expm_multiply``. ``"auto"`` picks the tridiagonal solver
+        up to ``TRIDIAGONAL_MAX_SITES`` sites, where its dense
+        eigenvectors still fit comfortably in memory.
+        """
+
+        if method == "auto":
+            method = (
+                "tridiagonal"
+                if self.n_sites <= TRIDIAGONAL_MAX_SITES
+                else "krylov"
+            )
+
+        psi0 = self.initial_state()
+        if method == "tridiagonal":
+            return spectral_propagate(
+                None, times, psi0, eigensystem=self.eigensystem()
+            )
+        if method == "krylov":
+            return krylov_propagate(self.hamiltonian(), times, psi0)
+        raise ValueError(
+            f"Unknown propagation method '{method}'. "
+            "Choose from: tridiagonal, krylov, auto"
+        )
+
+    def product_population(self, populations):
+        return product_population(populations, self.product_sites)
@@ -1,9 +1,12 @@
 import streamlit as st
 
 from ui.styles import load_theme
+from ui.diagnostics_page import diagnostics_page
 from ui.generate_page import generate_page
+from ui.jobs_page import jobs_page
 from ui.library_page import library_page
 from ui.screen_page import screen_page
+from ui.state import get_library
 
 st.set_page_config(
     page_title="Q-Enzyme Quantum Reaction Pathway Screener",
@@ -12,9 +15,6 @@ st.set_page_config(
 )
 load_theme()
 
-if "candidates" not in st.session_state:
-    st.session_state.candidates = []
-
 if "last_simulation" not in st.session_state:
     st.session_state.last_simulation = None
 
@@ -37,17 +37,19 @@ st.markdown("---")
 st.markdown(
     f"""
     <div class="candidate-badge">
-        Stored candidates: {len(st.session_state.candidates)} / 5
+        Stored candidates: {len(get_library())}
     </div>
     """,
     unsafe_allow_html=True
 )
 
-tab_generate, tab_library, tab_screen = st.tabs(
+tab_generate, tab_library, tab_screen, tab_jobs, tab_diagnostics = st.tabs(
     [
         "🧪 Generate",
         "📚 Candidate Library",
-        "📊 Screen & Rank"
+        "📊 Screen & Rank",
+        "⏳ Jobs",
+        "🩺 Diagnostics"
     ]
 )
 
@@ -60,6 +62,12 @@ with tab_library:
 with tab_screen:
     screen_page()
 
+with tab_jobs:
+    jobs_page()
+
+with tab_diagnostics:
+    diagnostics_page()
+
 def reset_session():
     for key in list(st.session_state.keys()):
         del st.session_state[key]
@@ -0,0 +1,138 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from simulator.instrumentation import register_source
+
+
+def _nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, tuple):
+        return sum(_nbytes(v) for v in value)
+    return 0
+
+
+def _freeze(value):
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, tuple):
+        for v in value:
+            _freeze(v)
+    return value
+
+
+def grid_key(times):
+    """Hashable identity of a time grid (length and content hash)."""
+
+    times = np.ascontiguousarray(times, dtype=float)
+    digest = hashlib.blake2b(times.tobytes(), digest_size=16).hexdigest()
+    return (len(times), digest)
+
+
+class PropagatorCache:
+    """
+    Process-wide LRU cache of eigendecompositions and populations.
+
+    Entries are keyed on the canonical parameter tuple of a model (the
+    fields of ``QEnzyme.summary()``) quantized to ``tolerance``, so
+    parameter points that differ only by round-off share an entry.
+    Eviction is least-recently-used, bounded both by entry count and by
+    the total size of the cached arrays. Cached arrays are read-only.
+    """
+
+    def __init__(
+        self,
+        max_entries=4096,
+        max_bytes=256 * 1024 ** 2,
+        tolerance=1e-9,
+        cache_populations=True,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.tolerance = tolerance
+        self.cache_populations = cache_populations
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, params):
+        values = np.asarray(tuple(params), dtype=float)
+        return tuple(int(q) for q in np.round(values / self.tolerance))
+
+    def get(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = _freeze(compute())
+        size = _nbytes(value)
+
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = value
+                self._bytes += size
+                self._evict()
+        return value
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or self._bytes > self.max_bytes
+        ):
+            _, value = self._entries.popitem(last=False)
+            self._bytes -= _nbytes(value)
+            self.evictions += 1
+
+    def eigensystem(self, params, H):
+        """Cached ``np.linalg.eigh(H)`` for the model with ``params``."""
+
+        return self.get(
+            ("eigh", self.key(params)),
+            lambda: tuple(np.linalg.eigh(H)),
+        )
+
+    def populations(self, params, times, compute):
+        """Cached populations of ``params`` on ``times``."""
+
+        if not self.cache_populations:
+            return compute()
+        return self.get(("pop", self.key(params), grid_key(times)), compute)
+
+    def resize(self, max_entries=None, max_bytes=None):
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+default_cache = PropagatorCache()
+register_source("propagator", default_cache.stats)
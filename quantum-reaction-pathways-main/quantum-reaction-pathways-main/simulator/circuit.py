@@ -0,0 +1,419 @@
+"""
+Parameterized Qiskit circuit backend for QEnzyme dynamics.
+
+The 4-site Hamiltonian is mapped to qubits, either in a binary encoding
+(2 qubits, site n is the basis state |n>) or one-hot (4 qubits, site n
+is a single excitation on qubit n), and evolved with a Trotterized
+circuit whose rotation angles are symbolic in the QEnzyme parameters and
+the evolution time. The template is transpiled once per configuration
+and cached; screening then only binds parameter values, so thousands
+of candidates are evaluated without recompiling.
+
+Locally, the transpiled template is compiled once more into a gate
+program whose rotation angles are quadratic polynomials in the bound
+values, and all bindings are simulated together as one batched
+statevector. Any V2 Estimator (e.g. a hardware primitive) can be passed
+instead, in which case the populations are the expectation values of
+the site projectors.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from qiskit import transpile
+from qiskit.circuit import Parameter, ParameterExpression, QuantumCircuit
+from qiskit.circuit.library import PauliEvolutionGate
+from qiskit.quantum_info import Operator, SparsePauliOp
+
+from hamiltonians.qenzyme import QEnzyme
+from simulator.batch import iter_chunks
+from simulator.sweep import PARAMETERS
+
+ENCODINGS = ("binary", "one_hot")
+BASIS_GATES = ("rz", "sx", "x", "cx")
+N_SITES = 4
+MAX_AMPLITUDES = 1 << 20
+
+
+def _binary_operator(M):
+    return SparsePauliOp.from_operator(Operator(M))
+
+
+def _one_hot_operator(M):
+    """Single-excitation image of a site matrix on ``N_SITES`` qubits."""
+
+    terms = []
+    for n in range(N_SITES):
+        if M[n, n]:
+            z = ["I"] * N_SITES
+            z[N_SITES - 1 - n] = "Z"
+            terms += [("I" * N_SITES, M[n, n] / 2), ("".join(z), -M[n, n] / 2)]
+        for m in range(n + 1, N_SITES):
+            if M[n, m]:
+                for pauli in "XY":
+                    label = ["I"] * N_SITES
+                    label[N_SITES - 1 - n] = label[N_SITES - 1 - m] = pauli
+                    terms.append(("".join(label), M[n, m] / 2))
+    return SparsePauliOp.from_list(terms).simplify()
+
+
+def site_operator(M, encoding="binary"):
+    """Qubit operator of a real symmetric 4x4 site matrix."""
+
+    if encoding == "binary":
+        return _binary_operator(M)
+    if encoding == "one_hot":
+        return _one_hot_operator(M)
+    raise ValueError(
+        f"Unknown encoding '{encoding}'. Choose from: {', '.join(ENCODINGS)}"
+    )
+
+
+def site_indices(encoding="binary"):
+    """Computational basis index of each site."""
+
+    if encoding == "one_hot":
+        return [1 << n for n in range(N_SITES)]
+    return list(range(N_SITES))
+
+
+def site_projectors(encoding="binary"):
+    """Observables whose expectation values are the site populations."""
+
+    projectors = []
+    for n in range(N_SITES):
+        P = np.zeros((N_SITES, N_SITES))
+        P[n, n] = 1.0
+        projectors.append(site_operator(P, encoding))
+    return projectors
+
+
+def parameters():
+    """Symbolic QEnzyme parameters (``PARAMETERS`` order) and time."""
+
+    return tuple(Parameter(name) for name in PARAMETERS), Parameter("time")
+
+
+def pauli_terms(symbols, encoding="binary"):
+    """
+    Hamiltonian as ``[(pauli_label, coefficient_expression), ...]``.
+
+    H is linear in the parameters, H = H(0) + sum_p p dH/dp, so every
+    Pauli coefficient is a linear expression in the symbols.
+    """
+
+    constant = site_operator(QEnzyme.batch_hamiltonian(0.0)[0], encoding)
+    derivatives = QEnzyme.hamiltonian_derivatives()
+
+    coefficients = {}
+    for label, coeff in constant.to_list():
+        coefficients[label] = float(np.real(coeff))
+    for symbol, dH in zip(symbols, derivatives):
+        for label, coeff in site_operator(dH, encoding).to_list():
+            coefficients[label] = (
+                coefficients.get(label, 0.0) + float(np.real(coeff)) * symbol
+            )
+
+    return [
+        (label, coeff)
+        for label, coeff in coefficients.items()
+        if label.strip("I") and not (isinstance(coeff, float) and coeff == 0)
+    ]
+
+
+def trotter_circuit(steps=20, encoding="binary", order=2):
+    """
+    Symbolic Trotter circuit from the reactant site.
+
+    ``order=1`` is Lie-Trotter, ``order=2`` the symmetric Strang split.
+    Global-phase (identity) terms are dropped.
+    """
+
+    symbols, time = parameters()
+    terms = pauli_terms(symbols, encoding)
+    n_qubits = 2 if encoding == "binary" else N_SITES
+    dt = time / steps
+
+    circuit = QuantumCircuit(n_qubits, name="qenzyme_trotter")
+    if encoding == "one_hot":
+        circuit.x(0)
+
+    def evolve(sequence, scale):
+        for label, coeff in sequence:
+            circuit.append(
+                PauliEvolutionGate(SparsePauliOp(label), time=coeff * dt * scale),
+                range(n_qubits),
+            )
+
+    for _ in range(steps):
+        if order == 1:
+            evolve(terms, 1.0)
+        elif order == 2:
+            evolve(terms[:-1], 0.5)
+            evolve(terms[-1:], 1.0)
+            evolve(terms[-2::-1], 0.5)
+        else:
+            raise ValueError("Trotter order must be 1 or 2")
+
+    return circuit
+
+
+@lru_cache(maxsize=32)
+def transpiled_template(
+    steps=20,
+    encoding="binary",
+    order=2,
+    basis_gates=BASIS_GATES,
+    optimization_level=1,
+):
+    """Transpile the symbolic circuit once per configuration (cached)."""
+
+    return transpile(
+        trotter_circuit(steps, encoding, order),
+        basis_gates=list(basis_gates),
+        optimization_level=optimization_level,
+    )
+
+
+def bind_values(circuit, params, times):
+    """
+    Parameter value array of shape (B, T, n_parameters).
+
+    Columns follow ``circuit.parameters``, which the Estimator expects.
+    """
+
+    columns = dict(zip(
+        PARAMETERS,
+        (np.ravel(p) for p in QEnzyme.batch_parameters(*params)),
+    ))
+    times = np.asarray(times, dtype=float)
+    n_batch = columns[PARAMETERS[0]].size
+
+    values = np.empty((n_batch, times.size, circuit.num_parameters))
+    for i, parameter in enumerate(circuit.parameters):
+        if parameter.name == "time":
+            values[..., i] = times[None, :]
+        else:
+            values[..., i] = columns[parameter.name][:, None]
+    return values
+
+
+def _at_zero(expr):
+    if isinstance(expr, ParameterExpression):
+        return float(expr.bind({p: 0.0 for p in expr.parameters}))
+    return float(expr)
+
+
+def angle_polynomial(expr, parameters, seed=0):
+    """
+    ``(c, g, h)`` with ``expr(x) = c + g.x + x.h.x / 2``.
+
+    Trotter angles are products of a coefficient linear in the QEnzyme
+    parameters and the time step, so the expansion from the symbolic
+    first and second derivatives is exact; it is checked at a random
+    point and ``ValueError`` is raised for anything else.
+    """
+
+    n = len(parameters)
+    g, h = np.zeros(n), np.zeros((n, n))
+    if not isinstance(expr, ParameterExpression):
+        return float(expr), g, h
+
+    c = _at_zero(expr)
+    for i, p in enumerate(parameters):
+        if p not in expr.parameters:
+            continue
+        first = expr.gradient(p)
+        g[i] = _at_zero(first)
+        if not isinstance(first, ParameterExpression):
+            continue
+        for j, q in enumerate(parameters):
+            if q in first.parameters:
+                h[i, j] = _at_zero(first.gradient(q))
+
+    x = np.random.default_rng(seed).uniform(-1, 1, n)
+    exact = float(expr.bind({
+        p: x[i] for i, p in enumerate(parameters) if p in expr.parameters
+    }))
+    if not np.isclose(exact, c + g @ x + x @ h @ x / 2, rtol=1e-9, atol=1e-12):
+        raise ValueError(f"Gate angle {expr} is not quadratic in its parameters")
+
+    return c, g, h
+
+
+def _diagonal_weights(name, qubit, n_qubits):
+    """Phase per basis state of ``rz``/``p`` on ``qubit``, per unit angle."""
+
+    bit = (np.arange(2 ** n_qubits) >> qubit) & 1
+    if name == "rz":
+        return bit - 0.5
+    if name == "p":
+        return bit.astype(float)
+    raise ValueError(
+        f"Unsupported parameterized gate '{name}'; "
+        "transpile to a basis whose parameterized gates are rz or p"
+    )
+
+
+def compile_program(circuit):
+    """
+    Fused gate program of a transpiled template for batched simulation.
+
+    Runs of fixed gates are multiplied into one 2^n x 2^n unitary, and
+    runs of parameterized ``rz``/``p`` gates into one diagonal whose
+    phase per basis state is a quadratic polynomial of the bound values,
+    stored as weights on the features ``(1, x, x x^T)``. Entries are
+    ``("unitary", U)`` or ``("diagonal", W)``.
+    """
+
+    parameters = list(circuit.parameters)
+    n_qubits, n_params = circuit.num_qubits, len(parameters)
+    program = []
+    fixed = QuantumCircuit(n_qubits)
+    diagonal = None
+
+    def flush():
+        nonlocal fixed, diagonal
+        if fixed.data:
+            program.append(("unitary", Operator(fixed).data))
+            fixed = QuantumCircuit(n_qubits)
+        if diagonal is not None:
+            c, g, h = diagonal
+            weights = np.hstack([c[:, None], g, h.reshape(len(h), -1) / 2])
+            program.append(("diagonal", weights.T))
+            diagonal = None
+
+    for instruction in circuit.data:
+        operation = instruction.operation
+        if operation.name == "barrier":
+            continue
+        qubits = [circuit.find_bit(q).index for q in instruction.qubits]
+
+        if any(isinstance(p, ParameterExpression) for p in operation.params):
+            if fixed.data:
+                flush()
+            if diagonal is None:
+                size = 2 ** n_qubits
+                diagonal = (
+                    np.zeros(size),
+                    np.zeros((size, n_params)),
+                    np.zeros((size, n_params, n_params)),
+                )
+            weights = _diagonal_weights(operation.name, qubits[0], n_qubits)
+            c, g, h = angle_polynomial(operation.params[0], parameters)
+            diagonal[0][:] += weights * c
+            diagonal[1][:] += weights[:, None] * g
+            diagonal[2][:] += weights[:, None, None] * h
+        else:
+            if diagonal is not None:
+                flush()
+            fixed.append(operation, qubits)
+
+    flush()
+    return program
+
+
+@lru_cache(maxsize=32)
+def _cached_program(steps, encoding, order, basis_gates, optimization_level):
+    return compile_program(
+        transpiled_template(steps, encoding, order, basis_gates, optimization_level)
+    )
+
+
+def statevector_batch(program, values, n_qubits):
+    """
+    Final statevectors for all bindings at once.
+
+    ``values`` is an (M, n_parameters) array in ``circuit.parameters``
+    order; returns an (M, 2 ** n_qubits) complex array.
+    """
+
+    n_bindings = values.shape[0]
+    features = np.hstack([
+        np.ones((n_bindings, 1)),
+        values,
+        (values[:, :, None] * values[:, None, :]).reshape(n_bindings, -1),
+    ])
+
+    state = np.zeros((n_bindings, 2 ** n_qubits), dtype=complex)
+    state[:, 0] = 1.0
+
+    for kind, matrix in program:
+        if kind == "unitary":
+            state = state @ matrix.T
+        else:
+            state *= np.exp(1j * (features @ matrix))
+
+    return state
+
+
+def simulate_circuit_batch(
+    tunneling,
+    product_stabilization=0.0,
+    ts_stabilization=0.0,
+    environment=0.0,
+    times=None,
+    steps=20,
+    encoding="binary",
+    order=2,
+    estimator=None,
+):
+    """
+    Site populations of many candidates from the Trotter circuit.
+
+    Every (candidate, time) pair is one binding of the cached transpiled
+    template. Without ``estimator`` the bindings are simulated as a
+    batched statevector in memory-bounded chunks; with one, they are
+    submitted as a single Estimator pub.
+
+    Returns
+    -------
+    populations : np.ndarray
+        Array of shape (B, T, 4), like ``QEnzyme.simulate_batch``
+    """
+
+    times = np.linspace(0, 10, 300) if times is None else np.asarray(times)
+    circuit = transpiled_template(steps, encoding, order)
+    values = bind_values(
+        circuit,
+        (tunneling, product_stabilization, ts_stabilization, environment),
+        times,
+    )
+
+    if estimator is not None:
+        # Shape (4, 1, 1) broadcasts against the (B, T) bindings.
+        observables = [[[projector]] for projector in site_projectors(encoding)]
+        result = estimator.run([(circuit, observables, values)]).result()[0]
+        return np.moveaxis(np.real(result.data.evs), 0, -1)
+
+    program = _cached_program(steps, encoding, order, BASIS_GATES, 1)
+    flat = values.reshape(-1, values.shape[-1])
+    populations = np.empty((flat.shape[0], N_SITES))
+    chunk = max(1, MAX_AMPLITUDES >> circuit.num_qubits)
+
+    for start, stop in iter_chunks(flat.shape[0], chunk):
+        state = statevector_batch(program, flat[start:stop], circuit.num_qubits)
+        populations[start:stop] = np.abs(state[:, site_indices(encoding)]) ** 2
+
+    return populations.reshape(values.shape[:2] + (N_SITES,))
+
+
+def cross_check(
+    tunneling,
+    product_stabilization=0.0,
+    ts_stabilization=0.0,
+    environment=0.0,
+    times=None,
+    **circuit_options,
+):
+    """
+    Largest population difference between the circuit and the spectral
+    engine; with exact simulation this is the Trotter error.
+    """
+
+    times = np.linspace(0, 10, 300) if times is None else np.asarray(times)
+    params = (tunneling, product_stabilization, ts_stabilization, environment)
+
+    circuit_pop = simulate_circuit_batch(*params, times=times, **circuit_options)
+    classical_pop = QEnzyme.simulate_batch(*params, times=times)
+    return float(np.abs(circuit_pop - classical_pop).max())
@@ -0,0 +1,297 @@
+"""
+Static-disorder Monte Carlo ensembles.
+
+Each realization perturbs the site energies and nearest-neighbour
+couplings of a Hamiltonian with random shifts, standing in for the
+conformations the active-site environment fluctuates between. The
+realizations of one chunk are propagated together with a batched
+eigendecomposition, and only running sums, metric samples and (if
+quantiles are requested) the chunk populations are kept.
+
+Draws come in fixed blocks of ``SAMPLER_BLOCK`` realizations, each with
+its own child of ``np.random.SeedSequence(seed)``, so an ensemble is
+reproducible from its seed regardless of ``chunk_size``.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from simulator.batch import chunk_size_for, spectral_propagate_batch
+from simulator.events import crossing_times
+from simulator.instrumentation import stage
+from simulator.metrics import combine, evaluate, expand_composite
+
+SAMPLER_BLOCK = 1024
+ENSEMBLE_METRICS = ("final_yield", "max_yield", "mean_yield", "speed")
+QUANTILES = (0.05, 0.5, 0.95)
+
+# Unit-variance draws, scaled by the site and coupling widths.
+DISTRIBUTIONS = {
+    "normal": lambda rng, shape: rng.standard_normal(shape),
+    "uniform": lambda rng, shape: rng.uniform(-np.sqrt(3), np.sqrt(3), shape),
+}
+
+
+@lru_cache(maxsize=2)
+def _unit_block(seed, block, width, distribution):
+    # Child ``block`` of SeedSequence(seed).spawn(...), without spawning
+    # the preceding children. Cached so chunks that split a block do not
+    # draw it twice.
+    child = np.random.SeedSequence(seed, spawn_key=(block,))
+    unit = DISTRIBUTIONS[distribution](
+        np.random.default_rng(child), (SAMPLER_BLOCK, width)
+    )
+    unit.flags.writeable = False
+    return unit
+
+
+def sample_disorder(
+    start,
+    stop,
+    n_sites,
+    site_sigma=0.0,
+    coupling_sigma=0.0,
+    distribution="normal",
+    seed=0,
+):
+    """
+    Disorder of realizations ``start`` to ``stop``.
+
+    Parameters
+    ----------
+    site_sigma : float or array_like
+        Standard deviation of the site energies, scalar or per site
+    coupling_sigma : float or array_like
+        Standard deviation of the couplings, scalar or per bond
+    distribution : str
+        "normal" or "uniform"
+
+    Returns
+    -------
+    site_shifts : np.ndarray
+        Array of shape (stop - start, n_sites)
+    coupling_shifts : np.ndarray
+        Array of shape (stop - start, n_sites - 1)
+    """
+
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(
+            f"Unknown disorder distribution '{distribution}'. "
+            f"Choose from: {', '.join(DISTRIBUTIONS)}"
+        )
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+
+    first, last = start // SAMPLER_BLOCK, (stop - 1) // SAMPLER_BLOCK
+    blocks = [
+        _unit_block(seed, block, 2 * n_sites - 1, distribution)
+        for block in range(first, last + 1)
+    ]
+    offset = start - first * SAMPLER_BLOCK
+    unit = np.concatenate(blocks)[offset:offset + stop - start]
+
+    site_sigma = np.broadcast_to(np.asarray(site_sigma, float), (n_sites,))
+    coupling_sigma = np.broadcast_to(
+        np.asarray(coupling_sigma, float), (n_sites - 1,)
+    )
+    return unit[:, :n_sites] * site_sigma, unit[:, n_sites:] * coupling_sigma
+
+
+def disordered_hamiltonians(H, site_shifts, coupling_shifts):
+    """Stack (R, N, N) of H with shifted diagonal and neighbour couplings."""
+
+    n_sites = H.shape[-1]
+    stack = np.repeat(np.asarray(H, dtype=float)[None], len(site_shifts), axis=0)
+
+    sites = np.arange(n_sites)
+    stack[:, sites, sites] += site_shifts
+    bonds = np.arange(n_sites - 1)
+    stack[:, bonds, bonds + 1] += coupling_shifts
+    stack[:, bonds + 1, bonds] += coupling_shifts
+    return stack
+
+
+def simulate_ensemble(
+    H,
+    times,
+    psi0,
+    n_realizations=1000,
+    site_sigma=0.0,
+    coupling_sigma=0.0,
+    distribution="normal",
+    seed=0,
+    chunk_size=None,
+    metrics=ENSEMBLE_METRICS,
+    quantiles=QUANTILES,
+    product=3,
+    threshold=0.4,
+):
+    """
+    Disorder-averaged dynamics of a dense Hamiltonian.
+
+    Parameters
+    ----------
+    H : np.ndarray
+        Mean Hamiltonian (N, N)
+    times : np.ndarray
+        Time grid of length T
+    psi0 : np.ndarray
+        Initial state (N,)
+    n_realizations : int
+        Number of disorder realizations R
+    site_sigma, coupling_sigma, distribution, seed
+        See ``sample_disorder``
+    chunk_size : int, optional
+        Realizations per batched eigendecomposition; derived from
+        ``DEFAULT_CHUNK_BYTES`` when omitted
+    metrics : iterable
+        Metrics evaluated on every realization; "speed" is solved
+        exactly with ``crossing_times``
+    quantiles : sequence of float or None
+        Population quantiles to report; they need all R trajectories in
+        memory, so pass ``None`` to keep only running moments
+
+    Returns
+    -------
+    ensemble : dict
+        "mean" and "std" populations (T, N), "quantiles" (Q, T, N) if
+        requested, "metrics" (metric -> (R,) samples),
+        "metric_summary" (see ``summarize``) and
+        "diagnostics" (see ``convergence``)
+    """
+
+    H = np.asarray(H, dtype=float)
+    times = np.asarray(times, dtype=float)
+    n_sites, n_times = H.shape[-1], len(times)
+    if chunk_size is None:
+        chunk_size = chunk_size_for(n_times, n_sites)
+
+    total = np.zeros((n_times, n_sites))
+    total_sq = np.zeros((n_times, n_sites))
+    samples = {metric: np.empty(n_realizations) for metric in metrics}
+    keep = None if quantiles is None else np.empty(
+        (n_realizations, n_times, n_sites)
+    )
+
+    for start in range(0, n_realizations, chunk_size):
+        stop = min(start + chunk_size, n_realizations)
+        shifts = sample_disorder(
+            start, stop, n_sites, site_sigma, coupling_sigma, distribution, seed
+        )
+        with stage("ensemble", items=stop - start):
+            stack = disordered_hamiltonians(H, *shifts)
+            eigensystem = np.linalg.eigh(stack)
+            pop = spectral_propagate_batch(
+                None, times, psi0, eigensystem=eigensystem
+            )
+
+        total += pop.sum(axis=0)
+        total_sq += (pop ** 2).sum(axis=0)
+        if keep is not None:
+            keep[start:stop] = pop
+
+        scores = evaluate(
+            pop, times, metrics=expand_composite(metrics), product=product,
+            threshold=threshold,
+        )
+        if "speed" in scores:
+            scores["speed"] = -crossing_times(
+                stack, psi0, threshold=threshold, t_max=times[-1],
+                product=product, eigensystem=eigensystem,
+            )
+        if "composite" in metrics:
+            scores["composite"] = combine(scores)
+        for metric in metrics:
+            samples[metric][start:stop] = scores[metric]
+
+    mean = total / n_realizations
+    variance = np.maximum(total_sq / n_realizations - mean ** 2, 0.0)
+
+    ensemble = {
+        "mean": mean,
+        "std": np.sqrt(variance),
+        "metrics": samples,
+        "metric_summary": {
+            metric: summarize(values, quantiles or QUANTILES)
+            for metric, values in samples.items()
+        },
+        "diagnostics": convergence(samples, variance, n_realizations),
+    }
+    if keep is not None:
+        ensemble["quantiles"] = np.quantile(keep, quantiles, axis=0)
+    return ensemble
+
+
+def summarize(values, quantiles=QUANTILES):
+    """
+    Mean, spread and quantiles of the finite samples of a metric.
+
+    Non-finite samples (a speed of -inf for realizations that never
+    react) are excluded; ``finite_fraction`` reports how many remain.
+    """
+
+    values = np.asarray(values, dtype=float)
+    finite = values[np.isfinite(values)]
+    if finite.size < 2:
+        return {
+            "mean": float(finite.mean()) if finite.size else np.nan,
+            "std": np.nan,
+            "sem": np.inf,
+            "quantiles": dict.fromkeys(quantiles, np.nan),
+            "finite_fraction": finite.size / max(values.size, 1),
+        }
+
+    std = finite.std(ddof=1)
+    return {
+        "mean": float(finite.mean()),
+        "std": float(std),
+        "sem": float(std / np.sqrt(finite.size)),
+        "quantiles": dict(zip(quantiles, np.quantile(finite, quantiles))),
+        "finite_fraction": finite.size / values.size,
+    }
+
+
+def convergence(samples, population_variance, n_realizations, n_checkpoints=20):
+    """
+    Monte Carlo convergence diagnostics.
+
+    For each metric, over its finite samples: the running mean at
+    ``n_checkpoints`` sample counts, the standard error of the final
+    mean, and the drift between the means of the first and second
+    halves of the ensemble relative to that error (values well above ~3
+    signal an unconverged or non-stationary estimate).
+    ``population_sem`` is the largest standard error of the mean
+    populations over time and sites.
+    """
+
+    counts = np.unique(
+        np.linspace(1, n_realizations, n_checkpoints).astype(int)
+    )
+    diagnostics = {
+        "n_realizations": n_realizations,
+        "population_sem": float(
+            np.sqrt(population_variance.max() / n_realizations)
+        ),
+        "metrics": {},
+    }
+
+    for metric, values in samples.items():
+        finite = np.isfinite(values)
+        cleaned = np.where(finite, values, 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            running = np.cumsum(cleaned) / np.cumsum(finite)
+
+        first, second = np.array_split(values[finite], 2)
+        sem = summarize(values)["sem"]
+        drift = (
+            abs(first.mean() - second.mean()) / (2 * sem)
+            if first.size and second.size and 0 < sem < np.inf else 0.0
+        )
+        diagnostics["metrics"][metric] = {
+            "counts": counts,
+            "running_mean": running[counts - 1],
+            "sem": sem,
+            "half_drift": float(drift),
+        }
+    return diagnostics
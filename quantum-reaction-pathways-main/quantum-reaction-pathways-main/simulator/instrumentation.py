@@ -0,0 +1,276 @@
+"""
+Opt-in timing, throughput and memory instrumentation.
+
+Hot paths wrap their work in ``stage(name, items)``. While
+instrumentation is disabled (the default) ``stage`` returns a shared
+no-op context manager, so the cost is one global lookup per call. When
+enabled, every stage records its wall time into a fixed-bucket
+histogram and counts the candidates it processed, which gives
+per-stage throughput.
+
+``snapshot`` combines the stages with the hit rates of registered
+caches and the peak memory of the process, and exports as JSON
+(``to_json``) or Prometheus text exposition format (``to_prometheus``).
+Stages run inside ``ProcessPoolExecutor`` workers are recorded in
+those worker processes, not in the parent.
+"""
+
+import bisect
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Histogram upper bounds in seconds, 1 us to 100 s at half-decade steps.
+BUCKETS = tuple(10.0 ** (k / 2) for k in range(-12, 5))
+PROMETHEUS_PREFIX = "qenzyme"
+
+_enabled = False
+_null_stage = nullcontext()
+_lock = threading.Lock()
+_stages = {}
+_sources = {}
+_started = None
+
+
+class Histogram:
+    """Counts of durations per bucket, with their sum and extremes."""
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.items = 0
+        self.max = 0.0
+
+    def observe(self, seconds, items=1):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.items += items
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Upper bucket bound below which a fraction ``q`` of calls fall."""
+
+        if not self.count:
+            return 0.0
+        target, seen = q * self.count, 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "calls": self.count,
+            "seconds": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": self.max,
+            "items": self.items,
+            "items_per_second": self.items / self.total if self.total else 0.0,
+        }
+
+
+class _Stage:
+    __slots__ = ("name", "items", "start")
+
+    def __init__(self, name, items):
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        with _lock:
+            histogram = _stages.get(self.name)
+            if histogram is None:
+                histogram = _stages[self.name] = Histogram()
+            histogram.observe(elapsed, self.items)
+        return False
+
+
+def stage(name, items=1):
+    """
+    Context manager timing one call of stage ``name``.
+
+    ``items`` is the number of candidates (or trajectories) the call
+    processes and feeds the stage throughput.
+    """
+
+    if not _enabled:
+        return _null_stage
+    return _Stage(name, items)
+
+
+def timed(name):
+    """Decorator form of ``stage`` with one item per call."""
+
+    def decorator(func):
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Stage(name, 1):
+                return func(*args, **kwargs)
+
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    return decorator
+
+
+def register_source(name, stats):
+    """
+    Report ``stats()`` under ``name`` in every snapshot.
+
+    ``stats`` returns a dict; a ``hit_rate`` entry is exported as a
+    cache hit ratio.
+    """
+
+    _sources[name] = stats
+
+
+def enable(trace_memory=False):
+    """
+    Start recording; ``trace_memory`` also tracks the Python-allocated
+    peak with ``tracemalloc``, which slows allocation-heavy code, and
+    ``trace_memory=False`` stops such tracing.
+    """
+
+    global _enabled, _started
+    _enabled = True
+    if _started is None:
+        _started = time.perf_counter()
+    if trace_memory != tracemalloc.is_tracing():
+        if trace_memory:
+            tracemalloc.start()
+        else:
+            tracemalloc.stop()
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    global _started
+    with _lock:
+        _stages.clear()
+    _started = time.perf_counter() if _enabled else None
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+
+
+def peak_memory():
+    """Peak resident set size of the process and traced Python peak, in bytes."""
+
+    memory = {}
+    if resource is not None:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes.
+        memory["peak_rss_bytes"] = rss if sys.platform == "darwin" else rss * 1024
+    if tracemalloc.is_tracing():
+        memory["traced_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+    return memory
+
+
+def snapshot():
+    with _lock:
+        stages = {name: h.summary() for name, h in sorted(_stages.items())}
+        buckets = {
+            name: list(zip(h.bounds, h.counts)) for name, h in _stages.items()
+        }
+
+    return {
+        "enabled": _enabled,
+        "uptime_seconds": time.perf_counter() - _started if _started else 0.0,
+        "stages": stages,
+        "buckets": buckets,
+        "caches": {name: stats() for name, stats in _sources.items()},
+        "memory": peak_memory(),
+    }
+
+
+def to_json(path=None, data=None):
+    data = snapshot() if data is None else data
+    text = json.dumps(data, indent=2, default=float)
+    if path is not None:
+        with open(path, "w") as f:
+            f.write(text)
+    return text
+
+
+def to_prometheus(path=None, data=None):
+    """Snapshot in the Prometheus text exposition format."""
+
+    data = snapshot() if data is None else data
+    p = PROMETHEUS_PREFIX
+    lines = [
+        f"# HELP {p}_stage_seconds Wall time per instrumented stage call.",
+        f"# TYPE {p}_stage_seconds histogram",
+    ]
+    for name, buckets in data["buckets"].items():
+        cumulative = 0
+        for bound, count in buckets:
+            cumulative += count
+            lines.append(
+                f'{p}_stage_seconds_bucket{{stage="{name}",le="{float(bound)!r}"}} '
+                f"{cumulative}"
+            )
+        summary = data["stages"][name]
+        lines.append(
+            f'{p}_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {summary["calls"]}'
+        )
+        lines.append(f'{p}_stage_seconds_sum{{stage="{name}"}} {summary["seconds"]!r}')
+        lines.append(f'{p}_stage_seconds_count{{stage="{name}"}} {summary["calls"]}')
+
+    lines += [
+        f"# HELP {p}_stage_items_total Candidates processed per stage.",
+        f"# TYPE {p}_stage_items_total counter",
+    ]
+    lines += [
+        f'{p}_stage_items_total{{stage="{name}"}} {summary["items"]}'
+        for name, summary in data["stages"].items()
+    ]
+
+    lines += [
+        f"# HELP {p}_cache_hit_ratio Hits per lookup of each cache.",
+        f"# TYPE {p}_cache_hit_ratio gauge",
+    ]
+    lines += [
+        f'{p}_cache_hit_ratio{{cache="{name}"}} {float(stats["hit_rate"])!r}'
+        for name, stats in data["caches"].items()
+        if "hit_rate" in stats
+    ]
+
+    for key, value in data["memory"].items():
+        lines += [f"# TYPE {p}_{key} gauge", f"{p}_{key} {value}"]
+
+    text = "\n".join(lines) + "\n"
+    if path is not None:
+        with open(path, "w") as f:
+            f.write(text)
+    return text
@@ -0,0 +1,251 @@
+import numpy as np
+
+from simulator.batch import chunk_size_for, iter_chunks
+from simulator.simulate import krylov_states
+
+MAX_EIGENVECTOR_CONDITION = 1e8
+
+
+def _kron(A, B):
+    """Kronecker product over the last two axes, broadcasting the rest."""
+
+    n, m = A.shape[-1], B.shape[-1]
+    product = A[..., :, None, :, None] * B[..., None, :, None, :]
+    return product.reshape(*product.shape[:-4], n * m, n * m)
+
+
+def _dagger(A):
+    return np.swapaxes(A, -1, -2).conj()
+
+
+def vectorize(rho):
+    """Column-stacking vec(rho), batched over leading axes."""
+
+    rho = np.asarray(rho, dtype=complex)
+    return np.swapaxes(rho, -1, -2).reshape(*rho.shape[:-2], -1)
+
+
+def lindblad_superoperator(H, jump_ops):
+    """
+    Lindblad generator acting on column-stacked density matrices.
+
+    With vec(A X B) = (B^T kron A) vec(X):
+
+        L = -i (I kron H - H^T kron I)
+            + sum_k [ conj(L_k) kron L_k
+                      - 1/2 I kron (L_k^† L_k)
+                      - 1/2 (L_k^† L_k)^T kron I ]
+
+    Parameters
+    ----------
+    H : np.ndarray
+        Hamiltonian (N, N), or a stack (B, N, N)
+    jump_ops : np.ndarray
+        Rate-weighted jump operators (K, N, N), or a stack (B, K, N, N)
+
+    Returns
+    -------
+    L : np.ndarray
+        Superoperator of shape (N^2, N^2), or (B, N^2, N^2)
+    """
+
+    H = np.asarray(H, dtype=complex)
+    jump_ops = np.asarray(jump_ops, dtype=complex)
+    identity = np.broadcast_to(np.eye(H.shape[-1]), H.shape)
+
+    L = -1j * (_kron(identity, H) - _kron(np.swapaxes(H, -1, -2), identity))
+
+    if jump_ops.shape[-3] == 0:
+        return L
+
+    jump_identity = np.broadcast_to(np.eye(H.shape[-1]), jump_ops.shape)
+    decay = _dagger(jump_ops) @ jump_ops
+    dissipator = (
+        _kron(jump_ops.conj(), jump_ops)
+        - 0.5 * _kron(jump_identity, decay)
+        - 0.5 * _kron(np.swapaxes(decay, -1, -2), jump_identity)
+    )
+    return L + dissipator.sum(axis=-3)
+
+
+def environment_channels(
+    H,
+    environment,
+    dephasing_scale=1.0,
+    relaxation_scale=0.5,
+    temperature=0.0,
+):
+    """
+    Jump operators parameterized by the environment strength.
+
+    * Pure dephasing on every site, rate ``dephasing_scale * environment``.
+    * Relaxation between neighbouring sites along the reaction
+      coordinate, from the higher to the lower site energy, rate
+      ``relaxation_scale * environment``; degenerate neighbours relax
+      toward the product end. With ``temperature > 0`` the uphill
+      process is added with its Boltzmann weight.
+
+    Parameters
+    ----------
+    H : np.ndarray
+        Hamiltonian (N, N), or a stack (B, N, N); site energies are taken
+        from its diagonal
+    environment : float or np.ndarray
+        Environment strength, scalar or one per stacked Hamiltonian
+
+    Returns
+    -------
+    jump_ops : np.ndarray
+        Rate-weighted jump operators (K, N, N), or (B, K, N, N)
+    """
+
+    H = np.asarray(H)
+    batched = H.ndim == 3
+    H = H if batched else H[None]
+    n_batch, n_states = H.shape[0], H.shape[-1]
+
+    env = np.broadcast_to(np.asarray(environment, dtype=float), (n_batch,))
+    dephasing = np.sqrt(np.clip(dephasing_scale * env, 0.0, None))
+    relaxation = np.clip(relaxation_scale * env, 0.0, None)
+
+    n_bonds = n_states - 1
+    n_channels = n_states + (2 if temperature > 0 else 1) * n_bonds
+    jump_ops = np.zeros((n_batch, n_channels, n_states, n_states))
+
+    sites = np.arange(n_states)
+    jump_ops[:, sites, sites, sites] = dephasing[:, None]
+
+    energies = np.real(np.diagonal(H, axis1=-2, axis2=-1))
+    for bond in range(n_bonds):
+        left, right = bond, bond + 1
+        gap = energies[:, right] - energies[:, left]
+        downhill_to_left = gap > 0
+
+        high = np.where(downhill_to_left, right, left)
+        low = np.where(downhill_to_left, left, right)
+        batch = np.arange(n_batch)
+
+        channel = n_states + bond
+        jump_ops[batch, channel, low, high] = np.sqrt(relaxation)
+
+        if temperature > 0:
+            uphill = relaxation * np.exp(-np.abs(gap) / temperature)
+            jump_ops[batch, channel + n_bonds, high, low] = np.sqrt(uphill)
+
+    return jump_ops if batched else jump_ops[0]
+
+
+def propagate_density(L, rho0_vec, times, rows=None):
+    """
+    vec(rho(t)) = exp(L t) vec(rho0) for one or a stack of generators.
+
+    The superoperator is diagonalized once; generators whose eigenvector
+    matrix is too ill-conditioned (near-defective) fall back to Krylov
+    ``expm_multiply``. ``rows`` restricts the output to selected entries
+    of vec(rho), e.g. the populations, which skips most of the work.
+
+    Returns
+    -------
+    rho_t : np.ndarray
+        Array of shape (T, N^2), or (B, T, N^2) for a stack; the last
+        axis has len(rows) entries when ``rows`` is given
+    """
+
+    times = np.asarray(times, dtype=float)
+    L = np.asarray(L, dtype=complex)
+    batched = L.ndim == 3
+    L = L if batched else L[None]
+    rho0_vec = np.broadcast_to(rho0_vec, L.shape[:-1])
+
+    rows = slice(None) if rows is None else np.asarray(rows)
+
+    rates, right = np.linalg.eig(L)
+    unstable = ~(np.linalg.cond(right) < MAX_EIGENVECTOR_CONDITION)
+    right[unstable] = np.eye(L.shape[-1])
+
+    coefficients = np.linalg.solve(right, rho0_vec[..., None])[..., 0]
+    decay = np.exp(rates[..., None, :] * times[:, None])
+    rho_t = (decay * coefficients[..., None, :]) @ np.swapaxes(
+        right[..., rows, :], -1, -2
+    )
+
+    for b in np.flatnonzero(unstable):
+        rho_t[b] = krylov_states(L[b], rho0_vec[b], times)[:, rows]
+
+    return rho_t if batched else rho_t[0]
+
+
+def population_rows(n_states):
+    """Positions of the diagonal of rho inside vec(rho)."""
+
+    return np.arange(n_states) * (n_states + 1)
+
+
+def simulate_open(H, times, psi0, jump_ops):
+    """
+    Open-system time evolution of a pure initial state.
+
+    Returns
+    -------
+    populations : np.ndarray
+        Site populations of shape (len(times), N)
+    """
+
+    psi0 = np.asarray(psi0, dtype=complex)
+    rho0 = vectorize(np.outer(psi0, psi0.conj()))
+    L = lindblad_superoperator(H, jump_ops)
+    rho_t = propagate_density(L, rho0, times, rows=population_rows(len(psi0)))
+    return np.real(rho_t)
+
+
+def simulate_open_batch(H, times, psi0, jump_ops, chunk_size=None, out=None):
+    """
+    Open-system evolution of a stack of Hamiltonians in chunks.
+
+    Parameters
+    ----------
+    H : np.ndarray
+        Hamiltonian stack (B, N, N)
+    times : np.ndarray
+        Time grid of length T
+    psi0 : np.ndarray
+        Shared initial state (N,)
+    jump_ops : np.ndarray or callable
+        Jump operator stack (B, K, N, N), or a callable
+        ``jump_ops(start, stop)`` returning the operators of rows
+        ``start:stop`` so they are only built one chunk at a time
+    chunk_size : int, optional
+        Candidates per batched eigendecomposition
+    out : np.ndarray, optional
+        Preallocated (B, T, N) array to fill
+
+    Returns
+    -------
+    populations : np.ndarray
+        Array of shape (B, T, N)
+    """
+
+    H = np.asarray(H)
+    n_batch, n_states = H.shape[0], H.shape[-1]
+    times = np.asarray(times, dtype=float)
+
+    if chunk_size is None:
+        chunk_size = chunk_size_for(len(times), n_states ** 2)
+    if out is None:
+        out = np.empty((n_batch, len(times), n_states))
+
+    psi0 = np.asarray(psi0, dtype=complex)
+    rho0 = vectorize(np.outer(psi0, psi0.conj()))
+
+    for start, stop in iter_chunks(n_batch, chunk_size):
+        chunk = H[start:stop]
+        if callable(jump_ops):
+            ops = jump_ops(start, stop)
+        else:
+            ops = jump_ops[start:stop]
+        L = lindblad_superoperator(chunk, ops)
+        out[start:stop] = np.real(
+            propagate_density(L, rho0, times, rows=population_rows(n_states))
+        )
+
+    return out
@@ -0,0 +1,182 @@
+"""
+Vectorized screening metrics.
+
+Every metric takes a population tensor ``pop`` of shape (..., T, N)
+(a single trajectory (T, N) or a batch (B, T, N)), the time grid
+``times`` of length T, the product region ``product`` (site index or
+indices) and the reaction ``threshold``, and returns one value per
+trajectory. Larger is better for every registered metric, so rankings
+are always descending.
+"""
+
+import numpy as np
+
+from simulator.instrumentation import stage
+from simulator.simulate import product_population
+
+METRICS = {}
+
+COMPOSITE_WEIGHTS = {"final_yield": 1.0, "speed": 0.3, "stability": 0.2}
+
+
+def register_metric(name, func=None):
+    """
+    Register a metric under ``name``.
+
+    Usable directly, ``register_metric("peak", f)``, or as a decorator,
+    ``@register_metric("peak")``. The function is called as
+    ``func(pop, times, product=..., threshold=...)`` and must return one
+    value per trajectory, larger meaning better.
+    """
+
+    def decorator(f):
+        METRICS[name] = f
+        return f
+
+    return decorator if func is None else decorator(func)
+
+
+@register_metric("final_yield")
+def final_yield(pop, times, product=3, threshold=0.4):
+    return product_population(pop[..., -1, :], product)
+
+
+@register_metric("max_yield")
+def max_yield(pop, times, product=3, threshold=0.4):
+    return product_population(pop, product).max(axis=-1)
+
+
+@register_metric("mean_yield")
+def mean_yield(pop, times, product=3, threshold=0.4):
+    return product_population(pop, product).mean(axis=-1)
+
+
+def threshold_time(pop, times, product=3, threshold=0.4):
+    """
+    First time the product population reaches ``threshold``.
+
+    The crossing is linearly interpolated between the last grid point
+    below and the first at or above the threshold. Trajectories that
+    never react get ``np.inf``.
+    """
+
+    product_pop = product_population(pop, product)
+    times = np.asarray(times, dtype=float)
+
+    crossed = product_pop >= threshold
+    reacted = crossed.any(axis=-1)
+    first = np.argmax(crossed, axis=-1)
+    before = np.maximum(first - 1, 0)
+
+    p_hi = np.take_along_axis(product_pop, first[..., None], axis=-1)[..., 0]
+    p_lo = np.take_along_axis(product_pop, before[..., None], axis=-1)[..., 0]
+    t_hi, t_lo = times[first], times[before]
+
+    rise = p_hi - p_lo
+    fraction = np.divide(
+        threshold - p_lo, rise, out=np.ones_like(rise), where=rise > 0
+    )
+    crossing = np.where(first > 0, t_lo + fraction * (t_hi - t_lo), t_hi)
+
+    return np.where(reacted, crossing, np.inf)
+
+
+@register_metric("speed")
+def speed(pop, times, product=3, threshold=0.4):
+    return -threshold_time(pop, times, product=product, threshold=threshold)
+
+
+@register_metric("selectivity")
+def selectivity(pop, times, product=3, threshold=0.4):
+    final = pop[..., -1, :]
+    final_product = product_population(final, product)
+    return final_product / (final.sum(axis=-1) - final_product + 1e-9)
+
+
+@register_metric("inhibition")
+def inhibition(pop, times, product=3, threshold=0.4):
+    """Remaining unreacted population, 1 - final yield (higher = stronger)."""
+
+    return 1.0 - final_yield(pop, times, product=product)
+
+
+def variance(pop, times, product=3, threshold=0.4):
+    return product_population(pop, product).var(axis=-1)
+
+
+@register_metric("stability")
+def stability(pop, times, product=3, threshold=0.4):
+    return -variance(pop, times, product=product)
+
+
+@register_metric("composite")
+def composite(pop, times, product=3, threshold=0.4, weights=None):
+    """Weighted sum of registered metrics (``COMPOSITE_WEIGHTS`` by default)."""
+
+    weights = COMPOSITE_WEIGHTS if weights is None else weights
+    return sum(
+        weight * METRICS[name](pop, times, product=product, threshold=threshold)
+        for name, weight in weights.items()
+    )
+
+
+def expand_composite(metrics, weights=None):
+    """
+    ``metrics`` with "composite" replaced by whichever of its components
+    are not requested already.
+
+    Lets callers that correct a component afterwards (e.g. exact
+    "speed") rebuild "composite" from the corrected columns with
+    ``combine``.
+    """
+
+    weights = COMPOSITE_WEIGHTS if weights is None else weights
+    names = [m for m in metrics if m != "composite"]
+    if "composite" in metrics:
+        names += [name for name in weights if name not in names]
+    return names
+
+
+def combine(scores, weights=None):
+    """Weighted sum of precomputed metric columns in ``scores``."""
+
+    weights = COMPOSITE_WEIGHTS if weights is None else weights
+    return sum(weight * scores[name] for name, weight in weights.items())
+
+
+def evaluate(pop, times, metrics=None, product=3, threshold=0.4):
+    """
+    Evaluate several metrics on a population tensor in one pass each.
+
+    Parameters
+    ----------
+    pop : np.ndarray
+        Populations (T, N) or (B, T, N)
+    times : np.ndarray
+        Time grid of length T
+    metrics : iterable, optional
+        Registered metric names or metric callables; all registered
+        metrics when omitted. Callables are reported under ``__name__``.
+
+    Returns
+    -------
+    scores : dict
+        Metric name -> value per trajectory
+    """
+
+    metrics = METRICS if metrics is None else metrics
+    scores = {}
+    with stage("metrics", items=len(pop) if np.ndim(pop) == 3 else 1):
+        for metric in metrics:
+            func = metric if callable(metric) else METRICS[metric]
+            name = func.__name__ if callable(metric) else metric
+            scores[name] = func(
+                pop, times, product=product, threshold=threshold
+            )
+    return scores
+
+
+def rank(scores):
+    """Indices that sort ``scores`` best-first (stable for ties)."""
+
+    return np.argsort(-np.asarray(scores, dtype=float), kind="stable")
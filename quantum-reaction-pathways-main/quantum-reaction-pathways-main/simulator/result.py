@@ -0,0 +1,198 @@
+"""
+Lazy simulation results.
+
+A ``SimulationResult`` keeps only the eigendecomposition of a
+time-independent Hamiltonian (single or batched), the initial state and
+the parameters. States, populations, coherences and metrics are
+evaluated on demand at whatever times are asked for and memoized per
+time grid, so a screen that needs a handful of scalars per candidate
+never materializes full trajectories: final-time metrics evaluate one
+time point, "speed" is solved exactly with ``crossing_times`` and the
+spectral metrics need no time grid at all.
+"""
+
+import numpy as np
+
+from simulator.averages import SPECTRAL_METRICS, long_time_populations
+from simulator.cache import grid_key
+from simulator.events import crossing_times
+from simulator.metrics import METRICS
+
+# Metrics that only read the populations at the last time point.
+FINAL_TIME_METRICS = ("final_yield", "selectivity", "inhibition")
+
+
+def _readonly(array):
+    array.flags.writeable = False
+    return array
+
+
+class SimulationResult:
+    """
+    Eigendecomposition-backed result of one or many closed-system runs.
+
+    Parameters
+    ----------
+    energies, vectors : np.ndarray
+        ``np.linalg.eigh`` output, single (N,), (N, N) or batched
+        (B, N), (B, N, N)
+    psi0 : np.ndarray
+        Initial state, shared (N,) or per candidate (B, N)
+    times : np.ndarray, optional
+        Default time grid for every accessor
+    params : dict, optional
+        Model parameters (``QEnzyme.summary()`` fields, arrays for a
+        batch)
+
+    Every array returned is read-only and memoized; per-site slices
+    such as ``product()`` are zero-copy views of the memoized
+    populations.
+    """
+
+    __slots__ = (
+        "energies", "vectors", "psi0", "times", "params", "_overlaps", "_memo"
+    )
+
+    def __init__(self, energies, vectors, psi0, times=None, params=None):
+        self.energies = np.asarray(energies)
+        self.vectors = np.asarray(vectors)
+        self.psi0 = np.asarray(psi0, dtype=complex)
+        self.times = None if times is None else np.asarray(times, dtype=float)
+        self.params = params
+        self._overlaps = None
+        self._memo = {}
+
+    @classmethod
+    def from_hamiltonian(cls, H, psi0, times=None, params=None, eigensystem=None):
+        if eigensystem is None:
+            eigensystem = np.linalg.eigh(H)
+        return cls(*eigensystem, psi0, times=times, params=params)
+
+    @property
+    def batched(self):
+        return self.energies.ndim == 2
+
+    def __len__(self):
+        return self.energies.shape[0] if self.batched else 1
+
+    def _grid(self, times):
+        if times is None:
+            times = self.times
+        if times is None:
+            raise ValueError("No time grid: pass times or set a default grid")
+        return np.asarray(times, dtype=float)
+
+    def _memoized(self, key, compute):
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def overlaps(self):
+        """Initial-state amplitudes V^† psi0 in the eigenbasis."""
+
+        if self._overlaps is None:
+            subscripts = "...kj,...k->...j"
+            self._overlaps = _readonly(
+                np.einsum(subscripts, self.vectors.conj(), self.psi0)
+            )
+        return self._overlaps
+
+    def states(self, times=None):
+        """psi(t), shape (T, N) or (B, T, N)."""
+
+        times = self._grid(times)
+
+        def compute():
+            phases = np.exp(
+                -1j * self.energies[..., None, :] * times[:, None]
+            )
+            return _readonly(
+                (phases * self.overlaps()[..., None, :])
+                @ np.swapaxes(self.vectors, -1, -2)
+            )
+
+        return self._memoized(("states", grid_key(times)), compute)
+
+    def populations(self, times=None):
+        """|psi(t)|^2, shape (T, N) or (B, T, N)."""
+
+        times = self._grid(times)
+        return self._memoized(
+            ("populations", grid_key(times)),
+            lambda: _readonly(np.abs(self.states(times)) ** 2),
+        )
+
+    def coherences(self, times=None):
+        """Density matrix psi(t) psi(t)^†, shape (T, N, N) or (B, T, N, N)."""
+
+        times = self._grid(times)
+
+        def compute():
+            psi = self.states(times)
+            return _readonly(psi[..., :, None] * psi[..., None, :].conj())
+
+        return self._memoized(("coherences", grid_key(times)), compute)
+
+    def product(self, times=None, product=3):
+        """Product-site population; a view when ``product`` is one site."""
+
+        populations = self.populations(times)
+        if np.ndim(product) == 0:
+            return populations[..., product]
+        return _readonly(populations[..., list(product)].sum(axis=-1))
+
+    def final_populations(self, times=None):
+        """Populations at the last time of the grid only."""
+
+        return self.populations(self._grid(times)[-1:])[..., 0, :]
+
+    def long_time_populations(self):
+        return self._memoized(
+            ("long_time",),
+            lambda: _readonly(
+                long_time_populations((self.energies, self.vectors), self.psi0)
+            ),
+        )
+
+    def metric(self, name, times=None, product=3, threshold=0.4):
+        """
+        Memoized metric ``name`` (``METRICS`` or ``SPECTRAL_METRICS``).
+
+        Final-time metrics evaluate the populations at ``times[-1]``
+        only, "speed" is the exact first crossing within ``times[-1]``
+        and spectral metrics only use the eigendecomposition.
+        """
+
+        times = self._grid(times)
+        sites = product if np.ndim(product) == 0 else tuple(product)
+        key = ("metric", name, grid_key(times), sites, threshold)
+
+        def compute():
+            if name in SPECTRAL_METRICS:
+                return SPECTRAL_METRICS[name](
+                    (self.energies, self.vectors), self.psi0, times,
+                    product=product,
+                )
+            if name == "speed":
+                return -crossing_times(
+                    None, self.psi0, threshold=threshold, t_max=times[-1],
+                    product=product, eigensystem=(self.energies, self.vectors),
+                )
+            grid = times[-1:] if name in FINAL_TIME_METRICS else times
+            return METRICS[name](
+                self.populations(grid), grid, product=product,
+                threshold=threshold,
+            )
+
+        return self._memoized(key, compute)
+
+    def metrics(self, names, times=None, product=3, threshold=0.4):
+        return {
+            name: self.metric(name, times, product=product, threshold=threshold)
+            for name in names
+        }
+
+    def clear(self):
+        """Drop memoized arrays, keeping the eigendecomposition."""
+
+        self._memo.clear()
@@ -0,0 +1,329 @@
+"""
+Global sensitivity analysis of screening metrics over QEnzyme parameters.
+
+Sobol indices use Saltelli's cross-sampled design (first-order indices
+with the Saltelli 2010 estimator, total indices with Jansen's) and
+Morris screening uses the classic one-at-a-time trajectories on a
+p-level grid. Designs are generated as whole arrays and evaluated in a
+single ``run_sweep`` call, so the model evaluations go through the
+batched, process-parallel QEnzyme path; an ``EvaluationCache`` on disk
+lets repeated or extended analyses reuse every point already computed.
+"""
+
+import os
+
+import numpy as np
+from scipy.stats import qmc
+
+from hamiltonians.qenzyme import PARAMETER_BOUNDS
+from simulator.cache import grid_key
+from simulator.sweep import DEFAULTS, PARAMETERS, design_columns, run_sweep
+
+
+class EvaluationCache:
+    """
+    On-disk store of evaluated design points, one file per metric and
+    time grid.
+
+    Points are keyed on their parameters quantized to ``tolerance``;
+    each file holds the sorted keys and the metric values, so lookups
+    for a whole design are a single ``searchsorted``.
+    """
+
+    def __init__(self, path, tolerance=1e-12):
+        self.path = path
+        self.tolerance = tolerance
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, times, metric):
+        n_times, digest = grid_key(times)
+        return os.path.join(self.path, f"{metric}-{n_times}-{digest}.npz")
+
+    def keys(self, columns):
+        quantized = np.round(np.column_stack(columns) / self.tolerance)
+        rows = np.ascontiguousarray(quantized.astype(np.int64))
+        return rows.view(np.dtype((np.void, rows.shape[1] * 8)))[:, 0]
+
+    def _load(self, times, metric):
+        path = self._file(times, metric)
+        if not os.path.exists(path):
+            return None, None
+        with np.load(path) as data:
+            return data["keys"], data["values"]
+
+    def lookup(self, columns, times, metric):
+        """Cached values (NaN where missing) and the hit mask."""
+
+        keys = self.keys(columns)
+        values = np.full(keys.size, np.nan)
+        stored_keys, stored_values = self._load(times, metric)
+        if stored_keys is None:
+            return values, np.zeros(keys.size, dtype=bool)
+
+        index = np.minimum(
+            np.searchsorted(stored_keys, keys), stored_keys.size - 1
+        )
+        hit = stored_keys[index] == keys
+        values[hit] = stored_values[index[hit]]
+        return values, hit
+
+    def store(self, columns, times, metric, values):
+        keys = self.keys(columns)
+        stored_keys, stored_values = self._load(times, metric)
+        if stored_keys is not None:
+            keys = np.concatenate([stored_keys, keys])
+            values = np.concatenate([stored_values, values])
+
+        keys, first = np.unique(keys, return_index=True)
+        path = self._file(times, metric)
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, keys=keys, values=np.asarray(values)[first])
+        os.replace(path + ".tmp", path)
+
+
+def evaluate_design(design, metrics, times=None, cache=None, **sweep_options):
+    """
+    Metric values for every design row, reusing cached points.
+
+    Rows missing any requested metric are evaluated together through
+    ``run_sweep`` (forwarding ``sweep_options``) and written back to
+    ``cache``.
+
+    Returns
+    -------
+    scores : dict
+        Metric name -> 1D array, one value per design row
+    """
+
+    times = np.linspace(0, 10, 300) if times is None else np.asarray(times)
+    columns = design_columns(design)
+    n_rows = columns[0].size
+
+    scores, missing = {}, np.zeros(n_rows, dtype=bool)
+    for metric in metrics:
+        if cache is None:
+            scores[metric], hit = np.full(n_rows, np.nan), np.zeros(n_rows, bool)
+        else:
+            scores[metric], hit = cache.lookup(columns, times, metric)
+        missing |= ~hit
+
+    if missing.any():
+        todo = [c[missing] for c in columns]
+        table = run_sweep(
+            dict(zip(PARAMETERS, todo)), times=times, metrics=metrics,
+            **sweep_options,
+        )
+        for metric in metrics:
+            scores[metric][missing] = table[metric]
+            if cache is not None:
+                cache.store(todo, times, metric, table[metric])
+
+    return scores
+
+
+def _factors(bounds):
+    bounds = PARAMETER_BOUNDS if bounds is None else bounds
+    names = [name for name in PARAMETERS if name in bounds]
+    low = np.array([bounds[name][0] for name in names], dtype=float)
+    high = np.array([bounds[name][1] for name in names], dtype=float)
+    return names, low, high
+
+
+def _design(names, low, high, unit):
+    design = {name: np.full(len(unit), DEFAULTS[name]) for name in PARAMETERS}
+    for i, name in enumerate(names):
+        design[name] = low[i] + unit[:, i] * (high[i] - low[i])
+    return design
+
+
+def _finite(values):
+    """
+    Clip non-finite outputs to the finite range.
+
+    Keeps the variance decomposition defined for metrics such as speed,
+    which is -inf for candidates that never react; the affected fraction
+    is reported alongside the indices.
+    """
+
+    values = np.asarray(values, dtype=float)
+    finite = np.isfinite(values)
+    nonfinite = 1.0 - finite.mean()
+    if finite.all() or not finite.any():
+        return values, nonfinite
+
+    low, high = values[finite].min(), values[finite].max()
+    values = np.nan_to_num(values, nan=low, posinf=high, neginf=low)
+    return np.clip(values, low, high), nonfinite
+
+
+def _sobol_estimates(f_A, f_B, f_AB):
+    variance = np.var(np.concatenate([f_A, f_B], axis=-1), axis=-1)
+    variance = np.where(variance > 0, variance, np.nan)[..., None]
+    first = np.mean(f_B[..., None, :] * (f_AB - f_A[..., None, :]), axis=-1)
+    total = 0.5 * np.mean((f_A[..., None, :] - f_AB) ** 2, axis=-1)
+    return first / variance, total / variance
+
+
+def sobol_indices(
+    metrics=("final_yield", "speed"),
+    n_samples=1024,
+    bounds=None,
+    times=None,
+    seed=0,
+    n_bootstrap=100,
+    cache=None,
+    **sweep_options,
+):
+    """
+    First-order and total Sobol indices of each metric.
+
+    Parameters
+    ----------
+    metrics : iterable of str
+        Registered metric names (``METRICS`` or ``SPECTRAL_METRICS``)
+    n_samples : int
+        Base sample size N, rounded up to a power of two; the design
+        has N (k + 2) rows for k varied parameters
+    bounds : dict, optional
+        Parameter -> (low, high); defaults to ``PARAMETER_BOUNDS``.
+        Parameters without bounds stay at their default
+    n_bootstrap : int
+        Resamples for the 95% confidence half-widths
+    cache : EvaluationCache, optional
+    **sweep_options
+        Forwarded to ``run_sweep`` (``chunk_size``, ``max_workers``)
+
+    Returns
+    -------
+    indices : dict
+        Metric name -> {"parameters", "S1", "S1_conf", "ST", "ST_conf",
+        "nonfinite_fraction"}
+    """
+
+    names, low, high = _factors(bounds)
+    k = len(names)
+    m = int(np.ceil(np.log2(max(n_samples, 2))))
+    base = qmc.Sobol(d=2 * k, seed=seed).random_base2(m)
+    A, B = base[:, :k], base[:, k:]
+    n = len(A)
+
+    AB = np.repeat(A[None], k, axis=0)
+    AB[np.arange(k), :, np.arange(k)] = B.T
+    unit = np.concatenate([A, B, AB.reshape(-1, k)])
+
+    scores = evaluate_design(
+        _design(names, low, high, unit), metrics, times=times, cache=cache,
+        **sweep_options,
+    )
+
+    rng = np.random.default_rng(seed)
+    resamples = rng.integers(0, n, size=(n_bootstrap, n))
+
+    indices = {}
+    for metric in metrics:
+        f, nonfinite = _finite(scores[metric])
+        f_A, f_B, f_AB = f[:n], f[n:2 * n], f[2 * n:].reshape(k, n)
+
+        S1, ST = _sobol_estimates(f_A, f_B, f_AB)
+        S1_boot, ST_boot = _sobol_estimates(
+            f_A[resamples], f_B[resamples], f_AB[:, resamples].transpose(1, 0, 2)
+        )
+        indices[metric] = {
+            "parameters": names,
+            "S1": S1,
+            "S1_conf": 1.96 * np.nanstd(S1_boot, axis=0),
+            "ST": ST,
+            "ST_conf": 1.96 * np.nanstd(ST_boot, axis=0),
+            "nonfinite_fraction": nonfinite,
+        }
+    return indices
+
+
+def morris_trajectories(n_trajectories, n_factors, levels=4, seed=0):
+    """
+    Unit-cube Morris trajectories, shape (r, k + 1, k).
+
+    Consecutive points differ in exactly one factor by
+    ``levels / (2 (levels - 1))``.
+    """
+
+    rng = np.random.default_rng(seed)
+    r, k = n_trajectories, n_factors
+    delta = levels / (2 * (levels - 1))
+
+    steps = np.arange(int(np.floor((1 - delta) * (levels - 1))) + 1) / (levels - 1)
+    start = rng.choice(steps, size=(r, k))
+    direction = rng.choice([-1.0, 1.0], size=(r, k))
+    order = np.argsort(rng.random((r, k)), axis=1)
+
+    lower = np.tril(np.ones((k + 1, k)), -1)
+    moves = ((2 * lower - 1)[None] * direction[:, None, :] + 1) * delta / 2
+    points = start[:, None, :] + moves
+
+    permuted = np.empty_like(points)
+    rows = np.arange(r)[:, None]
+    permuted[rows, :, order] = points.transpose(0, 2, 1)
+    return permuted
+
+
+def morris_screening(
+    metrics=("final_yield", "speed"),
+    n_trajectories=100,
+    levels=4,
+    bounds=None,
+    times=None,
+    seed=0,
+    n_bootstrap=100,
+    cache=None,
+    **sweep_options,
+):
+    """
+    Morris elementary-effect screening of each metric.
+
+    Effects are measured in unit-scaled parameters, so they compare
+    across parameters with different ranges. Same conventions as
+    ``sobol_indices``; the design has r (k + 1) rows.
+
+    Returns
+    -------
+    screening : dict
+        Metric name -> {"parameters", "mu", "mu_star", "mu_star_conf",
+        "sigma", "nonfinite_fraction"}
+    """
+
+    names, low, high = _factors(bounds)
+    k = len(names)
+    points = morris_trajectories(n_trajectories, k, levels=levels, seed=seed)
+
+    scores = evaluate_design(
+        _design(names, low, high, points.reshape(-1, k)), metrics,
+        times=times, cache=cache, **sweep_options,
+    )
+
+    step = np.diff(points, axis=1)
+    factor = np.argmax(np.abs(step), axis=2)
+    size = np.take_along_axis(step, factor[..., None], axis=2)[..., 0]
+
+    rng = np.random.default_rng(seed)
+    resamples = rng.integers(
+        0, n_trajectories, size=(n_bootstrap, n_trajectories)
+    )
+
+    screening = {}
+    for metric in metrics:
+        f, nonfinite = _finite(scores[metric])
+        f = f.reshape(n_trajectories, k + 1)
+        effects = np.empty((n_trajectories, k))
+        np.put_along_axis(effects, factor, np.diff(f, axis=1) / size, axis=1)
+
+        screening[metric] = {
+            "parameters": names,
+            "mu": effects.mean(axis=0),
+            "mu_star": np.abs(effects).mean(axis=0),
+            "mu_star_conf": 1.96 * np.std(
+                np.abs(effects)[resamples].mean(axis=1), axis=0
+            ),
+            "sigma": effects.std(axis=0, ddof=1),
+            "nonfinite_fraction": nonfinite,
+        }
+    return screening
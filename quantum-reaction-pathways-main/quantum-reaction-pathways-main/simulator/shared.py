@@ -0,0 +1,293 @@
+"""
+Shared-memory result aggregation for parallel sweeps.
+
+``run_sweep`` ships every shard's scores back to the parent through the
+process pool, which is fine for a few scalars per candidate but not for
+(T, N) populations. Here the parent preallocates one
+``multiprocessing.shared_memory`` block laid out as
+
+    done mask (B,) | metric columns (M, B) | populations (B, T, N)
+
+and workers attach to it by name, write their rows in place (the
+populations straight from ``QEnzyme.simulate_batch(out=...)``) and only
+return ``(start, stop)``. Rows are flagged in the done mask after their
+data is written, so the block can be read while the sweep is running,
+from the parent or from another process via ``SharedResults.attach``.
+
+The creating ``SharedResults`` owns the block and unlinks it when its
+context exits, when it is garbage-collected or at interpreter exit,
+including after a worker crash (``BrokenProcessPool``); a killed parent
+leaves the segment to ``multiprocessing``'s resource tracker.
+"""
+
+import ctypes
+import weakref
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from simulator.batch import iter_chunks
+from simulator.sweep import (
+    DEFAULT_METRICS,
+    PARAMETERS,
+    _evaluate_chunk,
+    design_columns,
+)
+
+ALIGNMENT = 64
+
+
+def _aligned(n_bytes):
+    return -(-n_bytes // ALIGNMENT) * ALIGNMENT
+
+
+def _attach(name):
+    try:
+        # Python 3.13+: attaching processes must not unlink on exit.
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _release(shm, owner):
+    try:
+        shm.close()
+    except BufferError:
+        # Views still hold the mapping; it is unmapped when the last
+        # of them is dropped.
+        shm._mmap = None
+        shm.close()
+    if owner:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedResults:
+    """
+    Sweep results in one shared-memory block.
+
+    Attributes
+    ----------
+    done : np.ndarray
+        Boolean (B,) mask of rows whose results are complete
+    scores : dict
+        Metric name -> (B,) float64 column (NaN until written)
+    populations : np.ndarray or None
+        (B, T, N) populations, when requested
+
+    Use ``SharedResults.create`` in the process that owns the block and
+    ``SharedResults.attach(results.layout)`` elsewhere. Views taken from
+    these attributes stay readable after ``close()``: the owner unlinks
+    the block's name right away, but the memory is only unmapped once
+    the last view is dropped.
+    """
+
+    def __init__(self, shm, layout, owner):
+        self.layout = layout
+        self._shm = shm
+        self._finalizer = weakref.finalize(self, _release, shm, owner)
+
+        n_rows, names = layout["n_rows"], layout["metrics"]
+        # numpy would keep only the mmap as base, which close() unmaps
+        # regardless; a ctypes array holds a buffer export instead, so
+        # the views below keep the mapping alive past close().
+        buffer = (ctypes.c_char * shm.size).from_buffer(shm.buf)
+        self.done = np.ndarray((n_rows,), dtype=np.bool_, buffer=buffer)
+
+        offset = _aligned(n_rows)
+        block = np.ndarray(
+            (len(names), n_rows), dtype=np.float64, buffer=buffer, offset=offset
+        )
+        self.scores = dict(zip(names, block))
+
+        self.populations = None
+        if layout["n_times"]:
+            offset += _aligned(block.nbytes)
+            self.populations = np.ndarray(
+                (n_rows, layout["n_times"], layout["n_states"]),
+                dtype=layout["dtype"],
+                buffer=buffer,
+                offset=offset,
+            )
+
+    @classmethod
+    def create(cls, n_rows, metrics, n_times=0, n_states=4, dtype="float64"):
+        """
+        Allocate a zeroed block for ``n_rows`` candidates.
+
+        ``n_times=0`` stores metrics only.
+        """
+
+        layout = {
+            "n_rows": int(n_rows),
+            "metrics": list(metrics),
+            "n_times": int(n_times),
+            "n_states": int(n_states),
+            "dtype": np.dtype(dtype).str,
+        }
+        size = _aligned(n_rows) + _aligned(8 * len(metrics) * n_rows)
+        size += n_rows * n_times * n_states * np.dtype(dtype).itemsize
+
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        layout["name"] = shm.name
+        results = cls(shm, layout, owner=True)
+        results.done[:] = False
+        for column in results.scores.values():
+            column[:] = np.nan
+        return results
+
+    @classmethod
+    def attach(cls, layout):
+        return cls(_attach(layout["name"]), layout, owner=False)
+
+    def __len__(self):
+        return self.layout["n_rows"]
+
+    def progress(self):
+        """Fraction of rows completed."""
+
+        return float(self.done.mean()) if len(self) else 1.0
+
+    def completed(self):
+        """Indices of the rows completed so far."""
+
+        return np.flatnonzero(self.done)
+
+    def table(self, columns=None):
+        """Copy of the metric columns, optionally with the design columns."""
+
+        table = {} if columns is None else dict(zip(PARAMETERS, columns))
+        table.update({name: column.copy() for name, column in self.scores.items()})
+        return table
+
+    def close(self):
+        """
+        Release this handle; the owner also unlinks the block.
+
+        Views taken earlier stay readable until they are dropped.
+        """
+
+        self.done = self.scores = self.populations = None
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _fill_shard(layout, start, stop, columns, times, metrics, precision):
+    results = SharedResults.attach(layout)
+    try:
+        out = None
+        if results.populations is not None:
+            out = results.populations[start:stop]
+        scores = _evaluate_chunk(
+            columns, times, metrics, precision=precision, out=out
+        )
+        for name, values in scores.items():
+            results.scores[name][start:stop] = values
+        results.done[start:stop] = True
+    finally:
+        results.close()
+    return start, stop
+
+
+def iter_shared_sweep(
+    design,
+    results,
+    times=None,
+    metrics=DEFAULT_METRICS,
+    chunk_size=4096,
+    max_workers=None,
+    precision="double",
+):
+    """
+    Fill ``results`` shard by shard, yielding ``(start, stop)`` as each
+    shard lands.
+
+    Rows already flagged done are skipped, so a partially filled block
+    can be resumed. Pending shards are cancelled when the consumer
+    stops early or a worker fails.
+    """
+
+    times = np.linspace(0, 10, 300) if times is None else np.asarray(times)
+    columns = design_columns(design)
+    if columns[0].size != len(results):
+        raise ValueError(
+            f"Design has {columns[0].size} rows, results hold {len(results)}"
+        )
+
+    bounds = [
+        (start, stop)
+        for start, stop in iter_chunks(len(results), chunk_size)
+        if not results.done[start:stop].all()
+    ]
+    fill = partial(
+        _fill_shard,
+        results.layout,
+        times=times,
+        metrics=metrics,
+        precision=precision,
+    )
+
+    if max_workers == 1 or len(bounds) <= 1:
+        for start, stop in bounds:
+            yield fill(start, stop, [c[start:stop] for c in columns])
+        return
+
+    pool = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [
+            pool.submit(fill, start, stop, [c[start:stop] for c in columns])
+            for start, stop in bounds
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def run_shared_sweep(
+    design,
+    times=None,
+    metrics=DEFAULT_METRICS,
+    chunk_size=4096,
+    max_workers=None,
+    populations=False,
+    precision="double",
+):
+    """
+    Evaluate a design into a new ``SharedResults`` block.
+
+    Parameters are those of ``run_sweep``; ``populations=True`` also
+    keeps the (B, T, 4) trajectories, in float32 for
+    ``precision="single"``. The caller owns the returned block and
+    should use it as a context manager. If the sweep fails, the block
+    is unlinked before the exception propagates.
+    """
+
+    times = np.linspace(0, 10, 300) if times is None else np.asarray(times)
+    n_rows = design_columns(design)[0].size
+    names = [m.__name__ if callable(m) else m for m in metrics]
+    dtype = np.float32 if precision == "single" else np.float64
+
+    results = SharedResults.create(
+        n_rows, names, n_times=len(times) if populations else 0, dtype=dtype
+    )
+    try:
+        for _ in iter_shared_sweep(
+            design, results, times=times, metrics=metrics,
+            chunk_size=chunk_size, max_workers=max_workers, precision=precision,
+        ):
+            pass
+    except BaseException:
+        results.close()
+        raise
+    return results
@@ -1,7 +1,256 @@
 import numpy as np
+from scipy import sparse
 from scipy.linalg import expm
+from scipy.sparse.linalg import expm_multiply
 
-def simulate(H, times, psi0):
+from simulator.instrumentation import stage
+
+SPECTRAL_MAX_STATES = 2000
+
+
+def expm_propagate(H, times, psi0):
+    """
+    Reference propagator: one matrix exponential per time point.
+
+    Kept for validation of the faster engines; every time point calls
+    ``expm(-1j * H * t)`` independently.
+    """
+
+    n_states = len(psi0)
+    populations = np.zeros((len(times), n_states))
+
+    for i, t in enumerate(times):
+        U = expm(-1j * H * t)
+        psi_t = U @ psi0
+        populations[i] = np.abs(psi_t) ** 2
+
+    return populations
+
+
+def spectral_propagate(H, times, psi0, eigensystem=None):
+    """
+    Diagonalize-once propagator for a time-independent Hermitian H.
+
+    H is diagonalized a single time, H = V diag(E) V^†, and every time
+    point is evaluated in one vectorized step:
+
+        psi(t) = V (exp(-i E t) * (V^† psi0))
+
+    Parameters
+    ----------
+    H : np.ndarray
+        Hermitian Hamiltonian matrix
+    times : np.ndarray
+        Time grid
+    psi0 : np.ndarray
+        Initial state vector
+    eigensystem : tuple, optional
+        Precomputed ``(energies, vectors)`` of H, e.g. from a cache
+
+    Returns
+    -------
+    populations : np.ndarray
+        Array of shape (len(times), n_states)
+    """
+
+    if eigensystem is None:
+        eigensystem = np.linalg.eigh(H)
+    energies, vectors = eigensystem
+    overlaps = vectors.conj().T @ np.asarray(psi0, dtype=complex)
+
+    phases = np.exp(-1j * np.outer(np.asarray(times, dtype=float), energies))
+    psi_t = (phases * overlaps) @ vectors.T
+
+    return np.abs(psi_t) ** 2
+
+
+def is_uniform_grid(times, rtol=1e-9):
+    times = np.asarray(times, dtype=float)
+    if len(times) < 3:
+        return True
+
+    steps = np.diff(times)
+    return bool(np.allclose(steps, steps[0], rtol=rtol, atol=0.0))
+
+
+def _exact_state(H, t, psi0):
+    if sparse.issparse(H):
+        return expm_multiply(-1j * t * H, psi0.T).T
+    return psi0 @ expm(-1j * H * t).T
+
+
+def _step_function(H, dt):
+    """psi -> exp(-i H dt) psi for states stacked along the first axis."""
+
+    if sparse.issparse(H):
+        generator = -1j * dt * sparse.csr_matrix(H)
+
+        def step(psi):
+            return expm_multiply(generator, psi.T).T
+    else:
+        U_T = expm(-1j * H * dt).T
+
+        def step(psi):
+            return psi @ U_T
+
+    return step
+
+
+def stepping_propagate(H, times, psi0, anchor_every=1000, norm_tol=1e-10):
+    """
+    Uniform-grid propagator reusing a single U(dt).
+
+    U(dt) is built once and applied as a repeated matrix-vector product.
+    Every ``anchor_every`` steps, or as soon as the norm drifts by more
+    than ``norm_tol``, the state is re-anchored against the exact
+    propagator ``exp(-i H t_k) psi0``. Sparse H never forms U(dt)
+    explicitly; each step is a Krylov ``expm_multiply``.
+
+    Parameters
+    ----------
+    H : np.ndarray or scipy.sparse matrix
+        Hamiltonian matrix
+    times : np.ndarray
+        Uniform time grid
+    psi0 : np.ndarray
+        Initial state (N,) or stacked batch of states (M, N)
+    anchor_every : int
+        Steps between exact re-anchoring
+    norm_tol : float
+        Allowed drift of the state norm before re-anchoring early
+
+    Returns
+    -------
+    populations : np.ndarray
+        Array of shape (len(times), N), or (M, len(times), N) for a batch
+    """
+
+    times = np.asarray(times, dtype=float)
+    if not is_uniform_grid(times):
+        raise ValueError("stepping_propagate requires a uniform time grid")
+
+    psi0 = np.asarray(psi0, dtype=complex)
+    batch = np.atleast_2d(psi0)
+    norms = np.linalg.norm(batch, axis=1)
+
+    populations = np.empty((batch.shape[0], len(times), batch.shape[1]))
+    if len(times) == 0:
+        return populations if psi0.ndim > 1 else populations[0]
+
+    dt = times[1] - times[0] if len(times) > 1 else 0.0
+    step = _step_function(H, dt)
+
+    psi = _exact_state(H, times[0], batch)
+    populations[:, 0] = np.abs(psi) ** 2
+
+    since_anchor = 0
+    for i in range(1, len(times)):
+        psi = step(psi)
+        since_anchor += 1
+
+        drift = np.max(np.abs(np.linalg.norm(psi, axis=1) - norms))
+        if since_anchor >= anchor_every or drift > norm_tol:
+            psi = _exact_state(H, times[i], batch)
+            since_anchor = 0
+
+        populations[:, i] = np.abs(psi) ** 2
+
+    return populations if psi0.ndim > 1 else populations[0]
+
+
+def krylov_states(A, v0, times):
+    """
+    ``exp(A t) v0`` on a time grid via ``expm_multiply``.
+
+    A uniform grid is evaluated in a single call, other grids interval
+    by interval. Returns an array of shape (len(times), len(v0)).
+    """
+
+    times = np.asarray(times, dtype=float)
+    v0 = np.asarray(v0, dtype=complex)
+
+    if len(times) == 0:
+        return np.empty((0, len(v0)), dtype=complex)
+
+    v_start = expm_multiply(A * times[0], v0) if times[0] else v0
+    if len(times) == 1:
+        return v_start[None, :]
+
+    if is_uniform_grid(times):
+        return expm_multiply(
+            A,
+            v_start,
+            start=0.0,
+            stop=times[-1] - times[0],
+            num=len(times),
+            endpoint=True,
+        )
+
+    states = np.empty((len(times), len(v0)), dtype=complex)
+    states[0] = v_start
+    for i in range(1, len(times)):
+        states[i] = expm_multiply(A * (times[i] - times[i - 1]), states[i - 1])
+
+    return states
+
+
+def krylov_propagate(H, times, psi0):
+    """
+    Krylov propagator for large sparse Hamiltonians.
+
+    Uses ``scipy.sparse.linalg.expm_multiply`` so H is only ever applied
+    to vectors, never exponentiated or diagonalized.
+    """
+
+    A = -1j * (sparse.csr_matrix(H) if sparse.issparse(H) else np.asarray(H))
+    return np.abs(krylov_states(A, psi0, times)) ** 2
+
+
+def product_population(populations, product=3):
+    """
+    Population of the product region.
+
+    ``product`` is a single site index or a collection of site indices
+    whose populations are summed.
+    """
+
+    if np.ndim(product) == 0:
+        return populations[..., product]
+    return populations[..., np.asarray(list(product))].sum(axis=-1)
+
+
+PROPAGATORS = {
+    "spectral": spectral_propagate,
+    "stepping": stepping_propagate,
+    "krylov": krylov_propagate,
+    "expm": expm_propagate,
+}
+
+
+def _is_large(H):
+    return sparse.issparse(H) or H.shape[0] > SPECTRAL_MAX_STATES
+
+
+def resolve_method(H, times, method="auto"):
+    """
+    Pick the propagation engine for ``method="auto"``.
+
+    Small dense Hamiltonians use the spectral engine. Sparse
+    Hamiltonians use the Krylov propagator, and large dense ones on a
+    uniform grid the stepping propagator; neither diagonalizes H.
+    """
+
+    if method != "auto":
+        return method
+
+    if sparse.issparse(H):
+        return "krylov"
+    if _is_large(H) and is_uniform_grid(times):
+        return "stepping"
+    return "spectral"
+
+
+def simulate(H, times, psi0, method="auto"):
     """
     Time-evolve an initial quantum state under Hamiltonian H.
 
@@ -13,6 +262,12 @@ def simulate(H, times, psi0):
         Time grid
     psi0 : np.ndarray
         Initial state vector
+    method : str
+        Propagation engine: "spectral" (one eigendecomposition for the
+        whole grid), "stepping" (one U(dt) reused on a uniform grid),
+        "krylov" (sparse expm_multiply), "expm" (reference, one matrix
+        exponential per time point) or "auto" (default, see
+        ``resolve_method``)
 
     Returns
     -------
@@ -20,12 +275,148 @@ def simulate(H, times, psi0):
         Population of each basis state over time
     """
 
-    n_states = len(psi0)
-    populations = np.zeros((len(times), n_states))
+    method = resolve_method(H, times, method)
+    try:
+        propagate = PROPAGATORS[method]
+    except KeyError:
+        raise ValueError(
+            f"Unknown propagation method '{method}'. "
+            f"Choose from: {', '.join(PROPAGATORS)}"
+        ) from None
 
-    for i, t in enumerate(times):
-        U = expm(-1j * H * t)
-        psi_t = U @ psi0
-        populations[i] = np.abs(psi_t) ** 2
+    with stage(f"simulate.{method}"):
+        return propagate(H, times, psi0)
 
-    return populations
+
+def linspace_chunks(start, stop, num, chunk_size=4096):
+    """
+    Lazily generate ``np.linspace(start, stop, num)`` in chunks.
+
+    Lets ``simulate_stream`` run trajectories whose time grid alone
+    would not fit in memory.
+    """
+
+    step = (stop - start) / (num - 1) if num > 1 else 0.0
+    for first in range(0, num, chunk_size):
+        last = min(first + chunk_size, num)
+        yield start + step * np.arange(first, last)
+
+
+def simulate_stream(H, times, psi0, chunk_size=4096, method="auto"):
+    """
+    Time-evolve psi0 and yield populations chunk by chunk.
+
+    Only one chunk of populations is alive at a time, so memory stays
+    bounded regardless of trajectory length. With the spectral engine
+    H is still diagonalized only once for the whole stream. "krylov"
+    and "stepping" carry the last state of each chunk into the next
+    one, so times must be increasing (and uniform for "stepping");
+    "expm" stays the per-time-point reference.
+
+    Parameters
+    ----------
+    H : np.ndarray
+        Hamiltonian matrix
+    times : np.ndarray or iterable
+        Time grid (sliced into ``chunk_size`` pieces) or an iterable of
+        time chunks such as ``linspace_chunks(...)``
+    psi0 : np.ndarray
+        Initial state vector
+    chunk_size : int
+        Time points per chunk when ``times`` is an array
+    method : str
+        Propagation engine, as in ``simulate``; "auto" picks "spectral"
+        unless H is sparse or large, then "krylov"
+
+    Yields
+    ------
+    times_chunk, populations_chunk : np.ndarray
+        Times of the chunk and populations of shape (len(times_chunk), n_states)
+    """
+
+    if isinstance(times, np.ndarray):
+        chunks = (
+            times[start:start + chunk_size]
+            for start in range(0, len(times), chunk_size)
+        )
+    else:
+        chunks = times
+
+    if method == "auto":
+        method = "krylov" if _is_large(H) else "spectral"
+    if method not in PROPAGATORS:
+        raise ValueError(
+            f"Unknown propagation method '{method}'. "
+            f"Choose from: {', '.join(PROPAGATORS)}"
+        )
+
+    if method == "krylov":
+        yield from _krylov_stream(H, chunks, psi0)
+        return
+    if method == "stepping":
+        yield from _stepping_stream(H, chunks, psi0)
+        return
+    if method == "expm":
+        for times_chunk in chunks:
+            times_chunk = np.asarray(times_chunk, dtype=float)
+            with stage("simulate.expm"):
+                pop = expm_propagate(H, times_chunk, psi0)
+            yield times_chunk, pop
+        return
+
+    energies, vectors = np.linalg.eigh(H)
+    overlaps = vectors.conj().T @ np.asarray(psi0, dtype=complex)
+
+    for times_chunk in chunks:
+        times_chunk = np.asarray(times_chunk, dtype=float)
+        phases = np.exp(-1j * np.outer(times_chunk, energies))
+        yield times_chunk, np.abs((phases * overlaps) @ vectors.T) ** 2
+
+
+def _krylov_stream(H, chunks, psi0):
+    A = -1j * (sparse.csr_matrix(H) if sparse.issparse(H) else np.asarray(H))
+    psi, t_prev = np.asarray(psi0, dtype=complex), 0.0
+    for times_chunk in chunks:
+        times_chunk = np.asarray(times_chunk, dtype=float)
+        with stage("simulate.krylov"):
+            states = krylov_states(A, psi, times_chunk - t_prev)
+        if len(times_chunk):
+            psi, t_prev = states[-1], times_chunk[-1]
+        yield times_chunk, np.abs(states) ** 2
+
+
+def _stepping_stream(H, chunks, psi0, anchor_every=1000, norm_tol=1e-10):
+    # Same scheme as stepping_propagate, with U(dt) and the re-anchoring
+    # counter carried across chunks.
+    psi0 = np.asarray(psi0, dtype=complex)
+    norm = np.linalg.norm(psi0)
+    psi, t_prev, dt, step, since_anchor = None, None, None, None, 0
+
+    for times_chunk in chunks:
+        times_chunk = np.asarray(times_chunk, dtype=float)
+        populations = np.empty((len(times_chunk), len(psi0)))
+
+        with stage("simulate.stepping"):
+            for i, t in enumerate(times_chunk):
+                if psi is None:
+                    psi = _exact_state(H, t, psi0)
+                else:
+                    if step is None:
+                        dt = t - t_prev
+                        step = _step_function(H, dt)
+                    elif not np.isclose(t - t_prev, dt, rtol=1e-9, atol=0.0):
+                        raise ValueError(
+                            "stepping requires a uniform time grid"
+                        )
+                    psi = step(psi)
+                    since_anchor += 1
+
+                    drift = abs(np.linalg.norm(psi) - norm)
+                    if since_anchor >= anchor_every or drift > norm_tol:
+                        psi = _exact_state(H, t, psi0)
+                        since_anchor = 0
+
+                populations[i] = np.abs(psi) ** 2
+                t_prev = t
+
+        yield times_chunk, populations
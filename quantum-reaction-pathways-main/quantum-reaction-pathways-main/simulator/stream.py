@@ -0,0 +1,133 @@
+import numpy as np
+
+from simulator.simulate import product_population, simulate_stream
+
+
+class RunningMetrics:
+    """
+    On-the-fly product-state metrics for streamed trajectories.
+
+    Accumulates the streamable metrics of ``simulator.metrics`` (final
+    yield, max yield, threshold time, selectivity, inhibition, mean and
+    variance of the product population) without keeping the trajectory.
+    Variance uses the pairwise (Chan et al.) update so it is exact
+    across chunks. ``product`` is a site index or a collection of site
+    indices forming the product region.
+    """
+
+    def __init__(self, product=3, threshold=0.4):
+        self.product = product
+        self.threshold = threshold
+
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.max_yield = -np.inf
+        self.max_time = np.nan
+        self.threshold_time = np.inf
+        self.final = None
+        self._last = None
+
+    def update(self, times, pop):
+        product = product_population(pop, self.product)
+        n = len(product)
+        if n == 0:
+            return
+
+        chunk_mean = product.mean()
+        chunk_m2 = np.sum((product - chunk_mean) ** 2)
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+        i = np.argmax(product)
+        if product[i] > self.max_yield:
+            self.max_yield = product[i]
+            self.max_time = times[i]
+
+        if np.isinf(self.threshold_time):
+            crossed = np.flatnonzero(product >= self.threshold)
+            if crossed.size:
+                self.threshold_time = self._interpolate(times, product, crossed[0])
+
+        self.final = pop[-1]
+        self._last = (times[-1], product[-1])
+
+    def _interpolate(self, times, product, i):
+        if i > 0:
+            t_lo, p_lo = times[i - 1], product[i - 1]
+        elif self._last is not None:
+            t_lo, p_lo = self._last
+        else:
+            return times[i]
+
+        rise = product[i] - p_lo
+        if rise <= 0:
+            return times[i]
+        return t_lo + (self.threshold - p_lo) / rise * (times[i] - t_lo)
+
+    def result(self):
+        if self.count == 0:
+            raise ValueError(
+                "No populations were streamed: the time grid is empty"
+            )
+
+        final = self.final
+        final_yield = product_population(final, self.product)
+        return {
+            "final_yield": final_yield,
+            "max_yield": self.max_yield,
+            "max_time": self.max_time,
+            "threshold_time": self.threshold_time,
+            "speed": -self.threshold_time,
+            "selectivity": final_yield / (np.sum(final) - final_yield + 1e-9),
+            "inhibition": 1.0 - final_yield,
+            "mean_yield": self.mean,
+            "variance": self.m2 / self.count,
+            "stability": -self.m2 / self.count,
+        }
+
+
+def stream_metrics(
+    H,
+    times,
+    psi0,
+    chunk_size=4096,
+    method="auto",
+    product=3,
+    threshold=0.4,
+    callback=None,
+):
+    """
+    Compute product metrics over a trajectory without materializing it.
+
+    Parameters
+    ----------
+    H, times, psi0, chunk_size, method
+        As in ``simulator.simulate.simulate_stream``
+    product : int or collection of int
+        Index (or indices) of the product region
+    threshold : float
+        Product population that counts as "reacted" for threshold_time
+    callback : callable, optional
+        Called as ``callback(times_chunk, populations_chunk)`` for every
+        chunk, e.g. to write the trajectory to disk or update progress
+
+    Returns
+    -------
+    metrics : dict
+        See ``RunningMetrics.result``
+    """
+
+    running = RunningMetrics(product=product, threshold=threshold)
+
+    for times_chunk, pop in simulate_stream(
+        H, times, psi0, chunk_size=chunk_size, method=method
+    ):
+        running.update(times_chunk, pop)
+        if callback is not None:
+            callback(times_chunk, pop)
+
+    return running.result()
@@ -0,0 +1,261 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+import numpy as np
+from scipy.stats import qmc
+
+from hamiltonians.qenzyme import PARAMETER_BOUNDS, QEnzyme
+from simulator.averages import SPECTRAL_METRICS
+from simulator.batch import iter_chunks
+from simulator.metrics import combine, evaluate, expand_composite
+from simulator.result import FINAL_TIME_METRICS
+
+PARAMETERS = ("tunneling", "product_bias", "ts_stabilization", "environment")
+DEFAULTS = {
+    "tunneling": 1.0,
+    "product_bias": 0.0,
+    "ts_stabilization": 0.0,
+    "environment": 0.0,
+}
+
+
+def grid_design(**axes):
+    """
+    Full factorial design over the QEnzyme parameters.
+
+    Each keyword names a parameter (keys of ``QEnzyme.summary()``) and
+    gives the values to scan; parameters that are not given stay at
+    their QEnzyme default.
+
+    Returns
+    -------
+    design : dict
+        Column name -> 1D array, one row per grid point
+    """
+
+    unknown = set(axes) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+
+    values = [np.atleast_1d(axes.get(name, DEFAULTS[name])) for name in PARAMETERS]
+    mesh = np.meshgrid(*values, indexing="ij")
+    return {name: m.ravel().astype(float) for name, m in zip(PARAMETERS, mesh)}
+
+
+def sample_design(n_samples, bounds=None, seed=0, method="lhs"):
+    """
+    Random design inside parameter bounds.
+
+    Parameters
+    ----------
+    n_samples : int
+        Number of design points
+    bounds : dict, optional
+        Parameter -> (low, high); defaults to the UI slider ranges in
+        ``PARAMETER_BOUNDS``. Parameters without bounds stay at default.
+    seed : int
+        Seed of the sampler, so designs are reproducible
+    method : str
+        "lhs" (Latin hypercube), "sobol" or "uniform"
+
+    Returns
+    -------
+    design : dict
+        Column name -> 1D array of length n_samples
+    """
+
+    bounds = PARAMETER_BOUNDS if bounds is None else bounds
+    names = [name for name in PARAMETERS if name in bounds]
+    low = np.array([bounds[name][0] for name in names], dtype=float)
+    high = np.array([bounds[name][1] for name in names], dtype=float)
+
+    if method == "lhs":
+        unit = qmc.LatinHypercube(d=len(names), seed=seed).random(n_samples)
+    elif method == "sobol":
+        unit = qmc.Sobol(d=len(names), seed=seed).random(n_samples)
+    elif method == "uniform":
+        unit = np.random.default_rng(seed).random((n_samples, len(names)))
+    else:
+        raise ValueError(f"Unknown sampling method '{method}'")
+
+    samples = low + unit * (high - low)
+    design = {
+        name: np.full(n_samples, DEFAULTS[name], dtype=float)
+        for name in PARAMETERS
+    }
+    for i, name in enumerate(names):
+        design[name] = samples[:, i]
+    return design
+
+
+DEFAULT_METRICS = (
+    "final_yield",
+    "max_yield",
+    "speed",
+    "selectivity",
+    "stability",
+)
+
+
+# Metrics a lazy ``SimulationResult`` computes without full trajectories.
+LAZY_METRICS = (*SPECTRAL_METRICS, *FINAL_TIME_METRICS, "speed")
+
+
+def _evaluate_chunk(columns, times, metrics, precision="double", out=None):
+    # "composite" is rebuilt from its components so it uses exact speed.
+    needed = expand_composite(metrics)
+    lazy = [m for m in needed if not callable(m) and m in LAZY_METRICS]
+    trajectory = [m for m in needed if callable(m) or m not in LAZY_METRICS]
+
+    scores = {}
+    if trajectory or out is not None:
+        pop = QEnzyme.simulate_batch(
+            *columns, times=times, precision=precision, out=out
+        )
+        scores = evaluate(pop, times, metrics=trajectory)
+
+    if lazy:
+        result = QEnzyme.result_batch(*columns, times=times)
+        for name in lazy:
+            scores[name] = result.metric(name)
+
+    if "composite" in metrics:
+        scores["composite"] = combine(scores)
+
+    names = [m.__name__ if callable(m) else m for m in metrics]
+    return {name: scores[name] for name in names}
+
+
+def design_columns(design):
+    """Design as broadcast 1D parameter columns in ``PARAMETERS`` order."""
+
+    columns = [
+        np.asarray(design.get(name, DEFAULTS[name]), dtype=float)
+        for name in PARAMETERS
+    ]
+    return [np.ravel(c) for c in np.broadcast_arrays(*columns)]
+
+
+def run_sweep(
+    design,
+    times=None,
+    metrics=DEFAULT_METRICS,
+    chunk_size=4096,
+    max_workers=None,
+    precision="double",
+):
+    """
+    Evaluate a design across a process pool.
+
+    The design is split into contiguous shards of ``chunk_size`` rows;
+    each worker simulates its shard with ``QEnzyme.simulate_batch`` and
+    returns only the per-candidate metrics. Shards are gathered in
+    order, so the table does not depend on ``max_workers``. "speed" is
+    solved exactly with ``QEnzyme.threshold_times`` rather than read off
+    the grid.
+
+    Parameters
+    ----------
+    design : dict
+        Column name -> 1D array, as from ``grid_design``/``sample_design``
+    times : np.ndarray, optional
+        Time grid, defaults to ``np.linspace(0, 10, 300)``
+    metrics : iterable
+        Names from ``simulator.metrics.METRICS`` or
+        ``simulator.averages.SPECTRAL_METRICS``, or picklable metric
+        functions; custom names must be registered at import time of a
+        module the workers also import. When only spectral metrics are
+        requested no trajectories are simulated at all
+    chunk_size : int
+        Candidates per shard
+    max_workers : int, optional
+        Worker processes; ``None`` uses every core, 1 runs in-process
+    precision : str
+        "double" or "single" trajectory propagation, see
+        ``QEnzyme.simulate_batch``. It only applies to metrics that need
+        full trajectories: ``LAZY_METRICS`` come from a double-precision
+        ``SimulationResult`` (one time point or the spectrum) and stay
+        float64, so a single-precision sweep of lazy metrics alone is
+        identical to a double one
+
+    Returns
+    -------
+    table : dict
+        Column name -> 1D array with the parameters followed by the
+        metrics (pass to ``pandas.DataFrame`` for a frame)
+    """
+
+    times = np.linspace(0, 10, 300) if times is None else np.asarray(times)
+    columns = design_columns(design)
+    n_rows = columns[0].size
+
+    shards = [
+        [c[start:stop] for c in columns]
+        for start, stop in iter_chunks(n_rows, chunk_size)
+    ]
+    evaluate_shard = partial(
+        _evaluate_chunk, times=times, metrics=metrics, precision=precision
+    )
+
+    if max_workers == 1 or len(shards) <= 1:
+        results = list(map(evaluate_shard, shards))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(evaluate_shard, shards))
+
+    table = dict(zip(PARAMETERS, columns))
+    for key in results[0] if results else ():
+        table[key] = np.concatenate([r[key] for r in results])
+    return table
+
+
+def iter_sweep(
+    design,
+    times=None,
+    metrics=DEFAULT_METRICS,
+    chunk_size=4096,
+    max_workers=None,
+    skip=(),
+    precision="double",
+):
+    """
+    Evaluate a design shard by shard, yielding results as they finish.
+
+    Same sharding as ``run_sweep``, but nothing is gathered: each shard
+    is yielded as ``(start, stop, scores)`` in completion order, so the
+    caller can persist it immediately. Shards whose ``start`` is in
+    ``skip`` (e.g. already checkpointed) are not evaluated. Pending
+    shards are cancelled when the consumer stops early or is
+    interrupted.
+    """
+
+    times = np.linspace(0, 10, 300) if times is None else np.asarray(times)
+    columns = design_columns(design)
+    skip = set(skip)
+
+    bounds = [
+        (start, stop)
+        for start, stop in iter_chunks(columns[0].size, chunk_size)
+        if start not in skip
+    ]
+    evaluate_shard = partial(
+        _evaluate_chunk, times=times, metrics=metrics, precision=precision
+    )
+
+    if max_workers == 1 or len(bounds) <= 1:
+        for start, stop in bounds:
+            yield start, stop, evaluate_shard([c[start:stop] for c in columns])
+        return
+
+    pool = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {
+            pool.submit(evaluate_shard, [c[start:stop] for c in columns]):
+                (start, stop)
+            for start, stop in bounds
+        }
+        for future in as_completed(futures):
+            start, stop = futures[future]
+            yield start, stop, future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
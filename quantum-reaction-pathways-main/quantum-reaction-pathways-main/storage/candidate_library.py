@@ -0,0 +1,449 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from hamiltonians.qenzyme import QEnzyme
+from simulator.metrics import combine, evaluate
+
+PARAMETERS = ("tunneling", "product_bias", "ts_stabilization", "environment")
+LIBRARY_METRICS = (
+    "final_yield",
+    "max_yield",
+    "speed",
+    "selectivity",
+    "inhibition",
+    "stability",
+    "composite",
+)
+
+DEFAULT_PATH = os.environ.get(
+    "QENZYME_LIBRARY",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".qenzyme_library"),
+)
+GROWTH_ELEMENTS = 1 << 20
+
+# Trajectory encodings: storage dtype, quantization scale (populations
+# in [0, 1] stored as round(p * scale)) and data file suffix. uint16
+# keeps populations to 8e-6 at a quarter of the float64 size.
+ENCODINGS = {
+    "float64": (np.float64, None, "f64"),
+    "float32": (np.float32, None, "f32"),
+    "float16": (np.float16, None, "f16"),
+    "uint16": (np.uint16, 65535, "u16"),
+    "uint8": (np.uint8, 255, "u8"),
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS grids (
+    id INTEGER PRIMARY KEY,
+    digest TEXT UNIQUE NOT NULL,
+    times BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    {", ".join(f"{p} REAL" for p in PARAMETERS)},
+    {", ".join(f"{m} REAL" for m in LIBRARY_METRICS)},
+    grid_id INTEGER NOT NULL REFERENCES grids(id),
+    offset INTEGER NOT NULL,
+    n_times INTEGER NOT NULL,
+    n_states INTEGER NOT NULL,
+    created REAL NOT NULL,
+    encoding TEXT NOT NULL DEFAULT 'float64',
+    product_only INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_name ON candidates(name);
+{"".join(
+    f"CREATE INDEX IF NOT EXISTS idx_candidates_{m} ON candidates({m});"
+    for m in LIBRARY_METRICS
+)}
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class CandidateLibrary:
+    """
+    Persistent candidate store.
+
+    Parameters and metrics live in an indexed SQLite table; trajectories
+    are appended to one memory-mapped file per encoding that grows in
+    chunks of ``GROWTH_ELEMENTS``. Rows only hold the offset, shape and
+    encoding of their trajectory, so listing, sorting and ranking never
+    touch trajectory data, and ``trajectory()`` returns a lazy view.
+    Time grids are stored once and shared by reference.
+
+    ``encoding`` (see ``ENCODINGS``) and ``product_only`` set how new
+    trajectories are stored; metrics are always computed from the
+    full-precision populations before encoding.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, encoding="float64", product_only=False):
+        _encoding(encoding)
+        self.path = path
+        self.encoding = encoding
+        self.product_only = product_only
+        os.makedirs(path, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(
+            os.path.join(path, "index.sqlite"), check_same_thread=False
+        )
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(SCHEMA)
+        self._migrate()
+
+        self._data = {}
+        self._grids = {}
+
+    def _migrate(self):
+        existing = {
+            row["name"]
+            for row in self._db.execute("PRAGMA table_info(candidates)")
+        }
+        with self._db:
+            if "encoding" not in existing:
+                self._db.execute(
+                    "ALTER TABLE candidates ADD COLUMN "
+                    "encoding TEXT NOT NULL DEFAULT 'float64'"
+                )
+            if "product_only" not in existing:
+                self._db.execute(
+                    "ALTER TABLE candidates ADD COLUMN "
+                    "product_only INTEGER NOT NULL DEFAULT 0"
+                )
+
+    @staticmethod
+    def _used_key(encoding):
+        return "used" if encoding == "float64" else f"used_{encoding}"
+
+    def _used(self, encoding="float64"):
+        row = self._db.execute(
+            "SELECT value FROM meta WHERE key = ?", (self._used_key(encoding),)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _bump_revision(self):
+        self._db.execute(
+            "INSERT INTO meta (key, value) VALUES ('revision', 1) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+        )
+
+    def revision(self):
+        """Counter that changes whenever candidates are added or removed."""
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM meta WHERE key = 'revision'"
+            ).fetchone()
+        return row[0] if row else 0
+
+    def _mapped(self, n_elements, encoding="float64"):
+        data = self._data.get(encoding)
+        if data is not None and len(data) >= n_elements:
+            return data
+
+        dtype, _, suffix = ENCODINGS[encoding]
+        itemsize = np.dtype(dtype).itemsize
+        path = os.path.join(self.path, f"trajectories.{suffix}")
+
+        size = os.path.getsize(path) // itemsize if os.path.exists(path) else 0
+        if size < n_elements or size == 0:
+            size = (n_elements // GROWTH_ELEMENTS + 1) * GROWTH_ELEMENTS
+            with open(path, "ab") as f:
+                f.truncate(size * itemsize)
+
+        if data is not None:
+            data.flush()
+        self._data[encoding] = np.memmap(path, dtype=dtype, mode="r+", shape=(size,))
+        return self._data[encoding]
+
+    def _grid_id(self, times):
+        times = np.ascontiguousarray(times, dtype=np.float64)
+        digest = hashlib.blake2b(times.tobytes(), digest_size=16).hexdigest()
+
+        self._db.execute(
+            "INSERT OR IGNORE INTO grids (digest, times) VALUES (?, ?)",
+            (digest, times.tobytes()),
+        )
+        return self._db.execute(
+            "SELECT id FROM grids WHERE digest = ?", (digest,)
+        ).fetchone()[0]
+
+    def append(self, name, params, times, pop, metrics=None, **storage):
+        """Store one candidate; returns its id."""
+
+        return self.append_many(
+            [name],
+            {key: [value] for key, value in _as_params(params).items()},
+            times,
+            np.asarray(pop)[None],
+            None if metrics is None else {k: [v] for k, v in metrics.items()},
+            **storage,
+        )[0]
+
+    def append_many(
+        self,
+        names,
+        params,
+        times,
+        pop,
+        metrics=None,
+        encoding=None,
+        product_only=None,
+        exact_speed=False,
+    ):
+        """
+        Store a batch of candidates sharing one time grid.
+
+        Parameters
+        ----------
+        names : list of str
+        params : dict
+            Parameter name -> 1D array of length B
+        times : np.ndarray
+            Shared time grid of length T
+        pop : np.ndarray
+            Populations of shape (B, T, N)
+        metrics : dict, optional
+            Precomputed ``LIBRARY_METRICS`` columns; computed from ``pop``
+            when omitted
+        encoding, product_only : optional
+            Override the library's storage settings for this batch
+        exact_speed : bool
+            Solve "speed" exactly from the QEnzyme parameters with
+            ``QEnzyme.threshold_times`` instead of interpolating ``pop``
+            (and rebuild "composite" from it). Only valid when ``pop``
+            is the closed-system QEnzyme run from t = 0 on ``times``
+
+        Returns
+        -------
+        ids : list of int
+        """
+
+        encoding = self.encoding if encoding is None else encoding
+        product_only = self.product_only if product_only is None else product_only
+        pop = np.asarray(pop)
+        if metrics is None:
+            metrics = evaluate(pop, times, metrics=LIBRARY_METRICS)
+            if exact_speed:
+                if times[0] != 0:
+                    raise ValueError(
+                        "exact_speed needs a time grid starting at t = 0"
+                    )
+                metrics["speed"] = -QEnzyme.threshold_times(
+                    *(params[p] for p in PARAMETERS), t_max=times[-1]
+                )
+                metrics["composite"] = combine(metrics)
+
+        stored = _encode(pop[..., -1:] if product_only else pop, encoding)
+        n_batch, n_times, n_states = stored.shape
+
+        with self._lock, self._db:
+            grid_id = self._grid_id(times)
+            start = self._used(encoding)
+            stop = start + stored.size
+
+            data = self._mapped(stop, encoding)
+            data[start:stop] = stored.ravel()
+            data.flush()
+
+            sequence = self._db.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'candidates'"
+            ).fetchone()
+            first_id = (sequence[0] if sequence else 0) + 1
+            ids = list(range(first_id, first_id + n_batch))
+
+            offsets = start + np.arange(n_batch) * n_times * n_states
+            now = time.time()
+            rows = [
+                (
+                    ids[i],
+                    names[i],
+                    *(float(params[p][i]) for p in PARAMETERS),
+                    *(float(metrics[m][i]) for m in LIBRARY_METRICS),
+                    grid_id,
+                    int(offsets[i]),
+                    n_times,
+                    n_states,
+                    now,
+                    encoding,
+                    int(bool(product_only)),
+                )
+                for i in range(n_batch)
+            ]
+            columns = ("id", "name") + PARAMETERS + LIBRARY_METRICS + (
+                "grid_id", "offset", "n_times", "n_states", "created",
+                "encoding", "product_only",
+            )
+            self._db.executemany(
+                f"INSERT INTO candidates ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                rows,
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (self._used_key(encoding), stop),
+            )
+            self._bump_revision()
+
+            return ids
+
+    def delete(self, candidate_id):
+        """Remove a candidate; its trajectory space is reclaimed by ``compact()``."""
+
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM candidates WHERE id = ?", (candidate_id,)
+            )
+            self._bump_revision()
+
+    def compact(self):
+        """Rewrite the trajectory files without the space of deleted rows."""
+
+        with self._lock, self._db:
+            for encoding in ENCODINGS:
+                self._compact(encoding)
+            self._bump_revision()
+
+    def _compact(self, encoding):
+        used = self._used(encoding)
+        if not used:
+            return
+
+        rows = self._db.execute(
+            "SELECT id, offset, n_times, n_states FROM candidates "
+            "WHERE encoding = ? ORDER BY offset",
+            (encoding,),
+        ).fetchall()
+
+        cursor = 0
+        data = self._mapped(used, encoding)
+        for row in rows:
+            size = row["n_times"] * row["n_states"]
+            if row["offset"] != cursor:
+                data[cursor:cursor + size] = data[
+                    row["offset"]:row["offset"] + size
+                ]
+                self._db.execute(
+                    "UPDATE candidates SET offset = ? WHERE id = ?",
+                    (cursor, row["id"]),
+                )
+            cursor += size
+
+        data.flush()
+        self._db.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (self._used_key(encoding), cursor),
+        )
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def rows(self, offset=0, limit=None, order_by="id", descending=False):
+        """Candidate rows (parameters and metrics, no trajectories)."""
+
+        if order_by not in ("id", "name", "created") + LIBRARY_METRICS:
+            raise ValueError(f"Cannot order candidates by '{order_by}'")
+
+        direction = "DESC" if descending else "ASC"
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT * FROM candidates ORDER BY {order_by} {direction} "
+                "LIMIT ? OFFSET ?",
+                (-1 if limit is None else limit, offset),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get(self, candidate_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM candidates WHERE id = ?", (candidate_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(candidate_id)
+        return dict(row)
+
+    def columns(self, names=("id", "name") + PARAMETERS + LIBRARY_METRICS):
+        """Whole-library columns as arrays, for vectorized ranking."""
+
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {', '.join(names)} FROM candidates ORDER BY id"
+            ).fetchall()
+        return {
+            name: np.array([row[i] for row in rows])
+            for i, name in enumerate(names)
+        }
+
+    def times(self, grid_id):
+        if grid_id not in self._grids:
+            with self._lock:
+                blob = self._db.execute(
+                    "SELECT times FROM grids WHERE id = ?", (grid_id,)
+                ).fetchone()[0]
+            self._grids[grid_id] = np.frombuffer(blob, dtype=np.float64)
+        return self._grids[grid_id]
+
+    def trajectory(self, candidate):
+        """
+        Read-only (T, N) view of a candidate's populations.
+
+        ``candidate`` is an id or a row from ``rows()``/``get()``. Float
+        encodings return a memmap view in the stored dtype, quantized
+        ones a decoded float32 copy. Candidates stored with
+        ``product_only`` have N = 1, holding the last (product) site.
+        """
+
+        row = candidate if isinstance(candidate, dict) else self.get(candidate)
+        size = row["n_times"] * row["n_states"]
+        encoding = row.get("encoding", "float64")
+
+        with self._lock:
+            data = self._mapped(row["offset"] + size, encoding)
+        view = data[row["offset"]:row["offset"] + size].reshape(
+            row["n_times"], row["n_states"]
+        )
+
+        scale = ENCODINGS[encoding][1]
+        if scale is not None:
+            view = view * np.float32(1.0 / scale)
+        view.flags.writeable = False
+        return view
+
+    def close(self):
+        with self._lock:
+            for data in self._data.values():
+                data.flush()
+            self._data = {}
+            self._db.close()
+
+
+def _encoding(encoding):
+    try:
+        return ENCODINGS[encoding]
+    except KeyError:
+        raise ValueError(
+            f"Unknown trajectory encoding '{encoding}'. "
+            f"Choose from: {', '.join(ENCODINGS)}"
+        ) from None
+
+
+def _encode(pop, encoding):
+    dtype, scale, _ = _encoding(encoding)
+    if scale is None:
+        return np.asarray(pop, dtype=dtype)
+    return np.rint(np.clip(pop, 0.0, 1.0) * scale).astype(dtype)
+
+
+def _as_params(params):
+    if isinstance(params, dict):
+        return {p: params[p] for p in PARAMETERS}
+    return dict(zip(PARAMETERS, params))
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from hamiltonians.qenzyme import QEnzyme
+from simulator.metrics import combine
+from storage.candidate_library import CandidateLibrary
+
+
+@pytest.fixture
+def library(tmp_path):
+    library = CandidateLibrary(str(tmp_path))
+    yield library
+    library.close()
+
+
+def test_round_trip(library):
+    result = QEnzyme(tunneling=1.5, bias=0.2).result(np.linspace(0, 10, 300))
+    candidate_id = library.append(
+        "a", result.params, result.times, result.populations()
+    )
+
+    candidate = library.get(candidate_id)
+    np.testing.assert_array_equal(
+        library.trajectory(candidate), result.populations()
+    )
+    np.testing.assert_array_equal(
+        library.times(candidate["grid_id"]), result.times
+    )
+
+
+def test_speed_follows_stored_populations(library):
+    enzyme = QEnzyme(tunneling=1.5, bias=0.2)
+    times = np.linspace(0, 10, 300)
+    result = enzyme.result(times)
+    library.append("grid", result.params, times, result.populations())
+    library.append(
+        "exact", result.params, times, result.populations(), exact_speed=True
+    )
+
+    # An offset grid is stored with speed read off its own populations.
+    offset = times + 2.0
+    library.append(
+        "offset", result.params, offset, enzyme.result(offset).populations()
+    )
+
+    columns = library.columns()
+    exact = -QEnzyme.threshold_times(1.5, 0.2, t_max=10.0)[0]
+    np.testing.assert_allclose(columns["speed"][:2], exact, atol=times[1])
+    assert columns["speed"][1] == exact
+    np.testing.assert_allclose(columns["composite"], combine(columns))
+
+    with pytest.raises(ValueError, match="t = 0"):
+        library.append(
+            "bad", result.params, offset, result.populations(),
+            exact_speed=True,
+        )
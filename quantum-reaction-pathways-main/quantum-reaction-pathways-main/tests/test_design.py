@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from simulator.design import OBJECTIVES, objective_and_gradient
+
+
+@pytest.mark.parametrize("objective", sorted(OBJECTIVES))
+def test_gradient_matches_finite_differences(objective):
+    params = np.array([1.2, 0.8, 0.3, 0.1])
+    times = np.linspace(0, 10, 301)
+    _, gradient = objective_and_gradient(params, times, objective=objective)
+
+    step = 1e-6
+    numeric = np.empty(4)
+    for i in range(4):
+        shift = np.eye(4)[i] * step
+        upper, _ = objective_and_gradient(params + shift, times, objective)
+        lower, _ = objective_and_gradient(params - shift, times, objective)
+        numeric[i] = (upper - lower) / (2 * step)
+
+    np.testing.assert_allclose(gradient, numeric, rtol=1e-5, atol=1e-7)
@@ -0,0 +1,30 @@
+import numpy as np
+
+from hamiltonians.qenzyme import QEnzyme
+from simulator.disorder import sample_disorder
+
+
+def test_draws_do_not_depend_on_chunking():
+    whole = np.hstack(sample_disorder(0, 3000, 4, 0.1, 0.05, seed=7))
+    pieces = np.vstack([
+        np.hstack(sample_disorder(
+            start, min(start + 700, 3000), 4, 0.1, 0.05, seed=7
+        ))
+        for start in range(0, 3000, 700)
+    ])
+    np.testing.assert_array_equal(whole, pieces)
+
+
+def test_ensemble_independent_of_chunk_size():
+    enzyme = QEnzyme(environment=0.2)
+    times = np.linspace(0, 10, 200)
+    small = enzyme.simulate_ensemble(
+        times, 1500, seed=1, chunk_size=100, quantiles=None
+    )
+    large = enzyme.simulate_ensemble(
+        times, 1500, seed=1, chunk_size=1500, quantiles=None
+    )
+
+    np.testing.assert_allclose(small["mean"], large["mean"], atol=1e-12)
+    for name, samples in small["metrics"].items():
+        np.testing.assert_allclose(samples, large["metrics"][name], atol=1e-12)
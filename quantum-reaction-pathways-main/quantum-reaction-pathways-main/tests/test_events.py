@@ -0,0 +1,34 @@
+import numpy as np
+
+from hamiltonians.qenzyme import QEnzyme
+from simulator.events import crossing_times
+from simulator.simulate import spectral_propagate
+
+PSI0 = np.array([1, 0, 0, 0], dtype=complex)
+
+
+def first_crossing_on_grid(H, threshold, times):
+    product = spectral_propagate(H, times, PSI0)[:, 3]
+    crossed = np.flatnonzero(product >= threshold)
+    return times[crossed[0]] if crossed.size else np.inf
+
+
+def test_crossing_times_match_dense_grid():
+    times = np.linspace(0, 10, 200001)
+    rng = np.random.default_rng(2)
+    H = QEnzyme.batch_hamiltonian(
+        rng.uniform(0.5, 2.0, 5), rng.uniform(0, 2, 5), rng.uniform(0, 1, 5)
+    )
+
+    exact = crossing_times(H, PSI0, threshold=0.4, t_max=times[-1])
+    for h, t in zip(H, exact):
+        expected = first_crossing_on_grid(h, 0.4, times)
+        if np.isinf(expected):
+            assert np.isinf(t)
+        else:
+            assert expected - times[1] <= t <= expected
+
+
+def test_crossing_times_unreached_threshold():
+    H = QEnzyme(tunneling=0.1, bias=0.0).hamiltonian()
+    assert np.isinf(crossing_times(H, PSI0, threshold=0.99, t_max=1.0))
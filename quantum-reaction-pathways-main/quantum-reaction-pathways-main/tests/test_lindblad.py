@@ -0,0 +1,37 @@
+import numpy as np
+from scipy.linalg import expm
+
+from hamiltonians.qenzyme import QEnzyme
+from simulator.lindblad import (
+    environment_channels,
+    lindblad_superoperator,
+    propagate_density,
+    vectorize,
+)
+
+
+def test_propagate_density_matches_expm():
+    H = QEnzyme(tunneling=1.1, bias=0.6, environment=0.3).hamiltonian()
+    L = lindblad_superoperator(
+        H, environment_channels(H, 0.3, temperature=0.5)
+    )
+    rho0 = np.zeros((4, 4), dtype=complex)
+    rho0[0, 0] = 1.0
+    rho0_vec = vectorize(rho0)
+    times = np.linspace(0, 10, 40)
+
+    reference = np.stack([expm(L * t) @ rho0_vec for t in times])
+    np.testing.assert_allclose(
+        propagate_density(L, rho0_vec, times), reference, atol=1e-10
+    )
+
+
+def test_propagate_density_preserves_trace():
+    H = QEnzyme(environment=0.2).hamiltonian()
+    L = lindblad_superoperator(H, environment_channels(H, 0.2))
+    rho0 = np.zeros((4, 4))
+    rho0[0, 0] = 1.0
+
+    rho_t = propagate_density(L, vectorize(rho0), np.linspace(0, 20, 50))
+    trace = rho_t.reshape(-1, 4, 4).trace(axis1=1, axis2=2)
+    np.testing.assert_allclose(trace, 1.0, atol=1e-10)
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from scipy import sparse
+
+from hamiltonians.qenzyme import QEnzyme
+from simulator.batch import spectral_propagate_batch
+from simulator.simulate import PROPAGATORS, expm_propagate, simulate_stream
+
+PSI0 = np.array([1, 0, 0, 0], dtype=complex)
+TIMES = np.linspace(0, 10, 200)
+
+
+def random_hamiltonian(n_states, seed=0):
+    M = np.random.default_rng(seed).normal(size=(n_states, n_states))
+    return (M + M.T) / 2
+
+
+@pytest.mark.parametrize("method", ["spectral", "stepping", "krylov"])
+def test_engines_match_expm(method):
+    H = QEnzyme(tunneling=1.3, bias=0.7, environment=0.2).hamiltonian()
+    reference = expm_propagate(H, TIMES, PSI0)
+
+    np.testing.assert_allclose(
+        PROPAGATORS[method](H, TIMES, PSI0), reference, atol=1e-12
+    )
+
+
+def test_krylov_sparse_matches_expm():
+    H = random_hamiltonian(20)
+    psi0 = np.eye(20)[0]
+    reference = expm_propagate(H, TIMES, psi0)
+
+    np.testing.assert_allclose(
+        PROPAGATORS["krylov"](sparse.csr_matrix(H), TIMES, psi0),
+        reference,
+        atol=1e-12,
+    )
+
+
+def test_batch_matches_expm():
+    rng = np.random.default_rng(1)
+    params = [rng.uniform(0.1, 2.0, 6), rng.uniform(0, 2, 6)]
+    H = QEnzyme.batch_hamiltonian(*params)
+    reference = np.stack([expm_propagate(h, TIMES, PSI0) for h in H])
+
+    np.testing.assert_allclose(
+        spectral_propagate_batch(H, TIMES, PSI0), reference, atol=1e-12
+    )
+    np.testing.assert_allclose(
+        QEnzyme.simulate_batch(*params, times=TIMES), reference, atol=1e-12
+    )
+
+
+@pytest.mark.parametrize("method", ["spectral", "stepping", "krylov", "expm"])
+def test_stream_matches_full_trajectory(method):
+    H = random_hamiltonian(12)
+    psi0 = np.eye(12)[0]
+    reference = expm_propagate(H, TIMES, psi0)
+
+    chunks = simulate_stream(H, TIMES, psi0, chunk_size=37, method=method)
+    streamed = np.concatenate([pop for _, pop in chunks])
+    np.testing.assert_allclose(streamed, reference, atol=1e-12)
+
+
+def test_stream_rejects_unknown_method():
+    with pytest.raises(ValueError, match="Unknown propagation method"):
+        list(simulate_stream(
+            random_hamiltonian(4), TIMES, PSI0, method="bogus"
+        ))
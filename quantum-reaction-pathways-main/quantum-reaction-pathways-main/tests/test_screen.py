@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from experiments.screen import screen
+from simulator.sweep import sample_design
+
+
+class Interrupt(Exception):
+    pass
+
+
+def run(tmp_path, name, progress=lambda message: None):
+    design = sample_design(40, seed=3)
+    names = np.array([f"c{i}" for i in range(40)])
+    output = tmp_path / f"{name}.csv"
+    top = screen(
+        names,
+        design,
+        str(output),
+        np.linspace(0, 10, 100),
+        chunk_size=8,
+        max_workers=1,
+        progress=progress,
+    )
+    return top, output.read_text()
+
+
+def test_resumed_screen_matches_clean_run(tmp_path):
+    clean_top, clean_table = run(tmp_path, "clean")
+
+    calls = []
+
+    def interrupt_after_two_shards(message):
+        calls.append(message)
+        if len(calls) == 2:
+            raise Interrupt()
+
+    with pytest.raises(Interrupt):
+        run(tmp_path, "resumed", progress=interrupt_after_two_shards)
+
+    messages = []
+    top, table = run(tmp_path, "resumed", progress=messages.append)
+    assert messages[0].startswith("Resuming: 16/40")
+    assert table == clean_table
+    assert top == clean_top
+
+
+def test_screen_rejects_mismatched_names(tmp_path):
+    with pytest.raises(ValueError, match="candidate names"):
+        screen(
+            np.array(["only-one"]),
+            sample_design(3),
+            str(tmp_path / "out.csv"),
+            np.linspace(0, 10, 20),
+        )
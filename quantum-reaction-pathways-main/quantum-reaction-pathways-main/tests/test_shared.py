@@ -0,0 +1,32 @@
+import numpy as np
+
+from simulator.shared import run_shared_sweep
+from simulator.sweep import run_sweep, sample_design
+
+TIMES = np.linspace(0, 10, 60)
+
+
+def test_shared_sweep_matches_run_sweep():
+    design = sample_design(50, seed=4)
+    expected = run_sweep(design, times=TIMES, chunk_size=16, max_workers=1)
+
+    with run_shared_sweep(
+        design, times=TIMES, chunk_size=16, max_workers=1
+    ) as results:
+        assert results.done.all()
+        for name, column in results.table().items():
+            np.testing.assert_array_equal(column, expected[name])
+
+
+def test_views_outlive_close():
+    results = run_shared_sweep(
+        sample_design(20, seed=5), times=TIMES, max_workers=1,
+        populations=True,
+    )
+    column = results.scores["final_yield"].copy()
+    view, populations = results.scores["final_yield"], results.populations
+    results.close()
+    del results
+
+    np.testing.assert_array_equal(view, column)
+    np.testing.assert_allclose(populations.sum(axis=-1), 1.0)
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from hamiltonians.qenzyme import QEnzyme
+from simulator.metrics import evaluate
+from simulator.stream import RunningMetrics, stream_metrics
+
+
+def test_stream_metrics_match_full_trajectory():
+    enzyme = QEnzyme(tunneling=1.4, bias=0.5)
+    times = np.linspace(0, 10, 1000)
+    pop = enzyme.simulate(times)
+
+    streamed = stream_metrics(
+        enzyme.hamiltonian(), times, np.eye(4)[0], chunk_size=64
+    )
+    full = evaluate(
+        pop, times, metrics=("final_yield", "max_yield", "stability")
+    )
+    for name, value in full.items():
+        np.testing.assert_allclose(streamed[name], value, atol=1e-12)
+
+
+def test_running_metrics_without_data():
+    with pytest.raises(ValueError, match="No populations"):
+        RunningMetrics().result()
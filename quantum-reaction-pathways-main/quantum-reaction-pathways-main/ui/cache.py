@@ -0,0 +1,105 @@
+import io
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import matplotlib.pyplot as plt
+import numpy as np
+import streamlit as st
+
+from hamiltonians.qenzyme import QEnzyme
+from simulator.instrumentation import register_source, stage
+from simulator.metrics import rank
+
+MAX_FIGURES = 256
+MAX_SIMULATIONS = 256
+
+
+@lru_cache(maxsize=MAX_SIMULATIONS)
+def simulate_candidate(params, t_max=10.0, n_times=300):
+    """
+    Memoized ``SimulationResult`` keyed on (tunneling, bias, ts, env)
+    and grid.
+
+    A plain LRU rather than ``st.cache_data``: it is called from
+    background job threads, which have no script run context.
+    """
+
+    tunneling, bias, ts, env = params
+    enzyme = QEnzyme(
+        tunneling=tunneling,
+        bias=bias,
+        ts_stabilization=ts,
+        environment=env,
+    )
+    return enzyme.result(np.linspace(0, t_max, n_times))
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def library_ranking(_library, revision, metric):
+    """Library columns and best-first order for ``metric``, per revision."""
+
+    columns = _library.columns()
+    return columns, rank(columns[metric])
+
+
+class FigureCache:
+    """
+    LRU of rendered figures as PNG bytes.
+
+    Keys are ``(kind, candidate_ids, *details)``; ``invalidate`` drops
+    every figure that shows a given candidate.
+    """
+
+    def __init__(self, max_entries=MAX_FIGURES):
+        self.max_entries = max_entries
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def png(self, key, render):
+        with self._lock:
+            if key in self._figures:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return self._figures[key]
+            self.misses += 1
+
+        with stage(f"render.{key[0]}"):
+            fig = render()
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format="png", bbox_inches="tight")
+            plt.close(fig)
+
+        with self._lock:
+            self._figures[key] = buffer.getvalue()
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+            return self._figures[key]
+
+    def invalidate(self, candidate_id):
+        with self._lock:
+            for key in [k for k in self._figures if candidate_id in k[1]]:
+                del self._figures[key]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._figures),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+@st.cache_resource
+def get_figure_cache():
+    cache = FigureCache()
+    register_source("figures", cache.stats)
+    return cache
+
+
+def show_figure(key, render):
+    st.image(get_figure_cache().png(key, render), use_container_width=True)
@@ -0,0 +1,105 @@
+import streamlit as st
+
+from simulator import instrumentation
+from ui.cache import get_figure_cache
+
+
+def _megabytes(n_bytes):
+    return f"{n_bytes / 1024 ** 2:.1f} MB"
+
+
+def diagnostics_page():
+
+    st.header("🩺 Diagnostics")
+    st.caption(
+        "Where time goes in this session: per-stage timings, cache hit "
+        "rates, throughput and peak memory."
+    )
+
+    st.markdown("---")
+
+    get_figure_cache()
+
+    col_toggle, col_memory, col_reset = st.columns(3)
+    with col_toggle:
+        enabled = st.toggle(
+            "Record instrumentation",
+            value=instrumentation.is_enabled(),
+            help="Timing is skipped entirely while this is off.",
+        )
+    with col_memory:
+        trace_memory = st.toggle(
+            "Trace Python allocations",
+            value=False,
+            help="Uses tracemalloc; slows allocation-heavy stages.",
+        )
+    if enabled:
+        instrumentation.enable(trace_memory=trace_memory)
+    else:
+        instrumentation.disable()
+
+    with col_reset:
+        if st.button("Reset counters"):
+            instrumentation.reset()
+
+    data = instrumentation.snapshot()
+
+    st.markdown("### Stages")
+    if data["stages"]:
+        st.dataframe(
+            [
+                {
+                    "stage": name,
+                    "calls": s["calls"],
+                    "total (s)": round(s["seconds"], 4),
+                    "mean (ms)": round(1e3 * s["mean"], 3),
+                    "p95 (ms)": round(1e3 * s["p95"], 3),
+                    "max (ms)": round(1e3 * s["max"], 3),
+                    "candidates": s["items"],
+                    "candidates / s": round(s["items_per_second"], 1),
+                }
+                for name, s in data["stages"].items()
+            ],
+            use_container_width=True,
+            hide_index=True,
+        )
+    else:
+        st.info(
+            "No stages recorded yet. Enable recording and run a "
+            "simulation or screen."
+        )
+
+    st.markdown("### Caches")
+    cache_columns = st.columns(max(len(data["caches"]), 1))
+    for column, (name, stats) in zip(cache_columns, data["caches"].items()):
+        column.metric(
+            f"{name.capitalize()} hit rate",
+            f"{100 * stats.get('hit_rate', 0.0):.1f}%",
+            help=f"{stats.get('hits', 0)} hits, {stats.get('misses', 0)} misses",
+        )
+
+    st.markdown("### Memory")
+    memory = data["memory"]
+    col_rss, col_traced = st.columns(2)
+    if "peak_rss_bytes" in memory:
+        col_rss.metric("Peak resident memory", _megabytes(memory["peak_rss_bytes"]))
+    if "traced_peak_bytes" in memory:
+        col_traced.metric(
+            "Peak traced allocations", _megabytes(memory["traced_peak_bytes"])
+        )
+
+    col_json, col_prometheus = st.columns(2)
+    with col_json:
+        st.download_button(
+            "Download JSON",
+            instrumentation.to_json(data=data),
+            file_name="qenzyme_diagnostics.json",
+            mime="application/json",
+        )
+    with col_prometheus:
+        st.download_button(
+            "Download Prometheus metrics",
+            instrumentation.to_prometheus(data=data),
+            file_name="qenzyme_metrics.prom",
+            mime="text/plain",
+        )
@@ -1,8 +1,22 @@
 import streamlit as st
-import numpy as np
 import matplotlib.pyplot as plt
 
-from hamiltonians.qenzyme import QEnzyme
+from ui.cache import show_figure
+from ui.jobs import DONE
+from ui.state import get_job_manager, get_library
+
+POLL_SECONDS = 0.5
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def wait_for_job(job):
+    """Show a running job and rerun the page once it finishes."""
+
+    if job.done:
+        st.rerun()
+    st.progress(job.progress(), text=f"{job.label} · {job.status}")
+    if st.button("Cancel simulation"):
+        job.cancel()
 
 
 def generate_page():
@@ -55,44 +69,46 @@ def generate_page():
     st.markdown("")
    
     if st.button("Generate & Simulate", type="primary"):
-        enzyme = QEnzyme(
-            tunneling=tunneling,
-            bias=bias,
-            ts_stabilization=ts,
-            environment=env,
-        )
+        job = get_job_manager().submit_simulation((tunneling, bias, ts, env))
+        st.session_state.generate_job = job.id
+
+    job_id = st.session_state.get("generate_job")
+    job = None if job_id is None else get_job_manager().get(job_id)
+    if job is not None and not job.done:
+        wait_for_job(job)
+    elif job_id is not None:
+        del st.session_state.generate_job
+        if job is not None and job.status == DONE:
+            st.session_state.last_simulation = job.result
+        elif job is not None and job.error:
+            st.error(f"Simulation failed: {job.error}")
 
-        times = np.linspace(0, 10, 300)
-        populations = enzyme.simulate(times)
-        st.session_state.last_simulation = {
-            "times": times,
-            "pop": populations,
-            "params": (tunneling, bias, ts, env),
-        }
-   
     if st.session_state.last_simulation is not None:
         sim = st.session_state.last_simulation
 
         st.markdown("### Quantum Reaction Pathway")
 
-        fig, ax = plt.subplots(figsize=(7.5, 4.5))
+        def render():
+            fig, ax = plt.subplots(figsize=(7.5, 4.5))
 
-        labels = [
-            "Reactant |0⟩",
-            "Transition (left) |1⟩",
-            "Transition (right) |2⟩",
-            "Product |3⟩",
-        ]
+            labels = [
+                "Reactant |0⟩",
+                "Transition (left) |1⟩",
+                "Transition (right) |2⟩",
+                "Product |3⟩",
+            ]
 
-        for i in range(4):
-            ax.plot(sim["times"], sim["pop"][:, i], label=labels[i])
+            for i in range(4):
+                ax.plot(sim.times, sim.populations()[:, i], label=labels[i])
 
-        ax.set_xlabel("Time")
-        ax.set_ylabel("Population")
-        ax.legend()
-        ax.grid(alpha=0.25)
+            ax.set_xlabel("Time")
+            ax.set_ylabel("Population")
+            ax.legend()
+            ax.grid(alpha=0.25)
+            return fig
 
-        st.pyplot(fig, use_container_width=True)
+        key = ("generate", (), tuple(sim.params.values()), len(sim.times))
+        show_figure(key, render)
         st.markdown("### Save or discard this simulation")
 
         name = st.text_input(
@@ -107,15 +123,14 @@ def generate_page():
             if st.button("Store candidate"):
                 if not name.strip():
                     st.warning("Please provide a candidate name.")
-                elif len(st.session_state.candidates) >= 5:
-                    st.warning("Maximum of 5 candidates allowed.")
                 else:
-                    st.session_state.candidates.append({
-                        "name": name.strip(),
-                        "times": sim["times"],
-                        "pop": sim["pop"],
-                        "params": sim["params"],
-                    })
+                    get_library().append(
+                        name.strip(),
+                        sim.params,
+                        sim.times,
+                        sim.populations(),
+                        exact_speed=True,
+                    )
                     st.session_state.last_simulation = None
                     st.rerun()
 
@@ -0,0 +1,240 @@
+"""
+Background simulation jobs for the UI.
+
+Streamlit reruns the whole script on every interaction, so work started
+in the script thread blocks the page and is started again by the next
+rerun. A ``JobManager`` (one per server, see ``ui.state``) runs jobs on
+a small thread pool instead: numpy releases the GIL inside ``eigh`` and
+the batched products, and threads can write straight into the shared
+``CandidateLibrary``. Pages only submit jobs and read their state.
+
+Scans are simulated shard by shard and every shard is appended to the
+library as soon as it finishes, so progress is visible in the library
+while the job runs and a cancelled job keeps the shards it completed.
+"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from hamiltonians.qenzyme import QEnzyme
+from simulator.batch import iter_chunks
+from simulator.instrumentation import stage
+from simulator.sweep import PARAMETERS, design_columns
+from ui.cache import simulate_candidate
+
+MAX_CONCURRENT_JOBS = 2
+MAX_FINISHED_JOBS = 50
+SCAN_CHUNK_SIZE = 256
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+FINISHED = (DONE, CANCELLED, FAILED)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """
+    State of one background job.
+
+    ``completed``/``total`` count candidates; ``result`` holds the
+    ``SimulationResult`` of a single simulation or the library ids
+    stored by a scan.
+    """
+
+    def __init__(self, job_id, kind, label, total):
+        self.id = job_id
+        self.kind = kind
+        self.label = label
+        self.total = total
+        self.completed = 0
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+        self._future = None
+
+    @property
+    def done(self):
+        return self.status in FINISHED
+
+    def progress(self):
+        return self.completed / self.total if self.total else 1.0
+
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def cancel(self):
+        """Request cancellation; running jobs stop at the next shard."""
+
+        self._cancel.set()
+        if self._future is not None and self._future.cancel():
+            self._finish(CANCELLED)
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def _finish(self, status, error=None):
+        self.status = status
+        self.error = error
+        self.finished = time.time()
+
+
+class JobManager:
+    """
+    Thread pool running simulation jobs across script reruns.
+
+    Parameters
+    ----------
+    library : CandidateLibrary
+        Where scan results are stored
+    max_workers : int
+        Jobs running at once; further jobs wait in the queue
+    """
+
+    def __init__(self, library, max_workers=MAX_CONCURRENT_JOBS):
+        self.library = library
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="qenzyme-job"
+        )
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, kind, label, total, work):
+        """
+        Run ``work(job)`` in the background and return the ``Job``.
+
+        ``work`` updates ``job.completed``, calls ``job.check_cancelled()``
+        between units of work and returns the job result.
+        """
+
+        with self._lock:
+            job = Job(next(self._ids), kind, label, total)
+            self._jobs[job.id] = job
+            self._prune()
+        job._future = self._pool.submit(self._run, job, work)
+        return job
+
+    def _run(self, job, work):
+        job.started = time.time()
+        job.status = RUNNING
+        try:
+            with stage(f"job.{job.kind}", items=job.total):
+                job.result = work(job)
+        except JobCancelled:
+            job._finish(CANCELLED)
+        except Exception as exc:
+            job._finish(FAILED, f"{type(exc).__name__}: {exc}")
+        else:
+            job._finish(DONE)
+
+    def submit_simulation(self, params, t_max=10.0, n_times=300):
+        """Simulate one (tunneling, bias, ts, env) candidate."""
+
+        tunneling, bias, ts, env = params = tuple(float(p) for p in params)
+
+        def work(job):
+            result = simulate_candidate(params, t_max, n_times)
+            result.populations()
+            job.completed = 1
+            return result
+
+        label = (
+            f"Simulate tunneling={tunneling:.2f}, bias={bias:.2f}, "
+            f"ts={ts:.2f}, env={env:.2f}"
+        )
+        return self.submit("simulation", label, 1, work)
+
+    def submit_scan(
+        self,
+        design,
+        prefix,
+        times=None,
+        chunk_size=SCAN_CHUNK_SIZE,
+        precision="double",
+    ):
+        """
+        Simulate a design and store every candidate in the library.
+
+        Candidates are named ``<prefix>-<row>`` and appended shard by
+        shard with ``CandidateLibrary.append_many``.
+        """
+
+        times = np.linspace(0, 10, 300) if times is None else np.asarray(times)
+        columns = design_columns(design)
+        n_rows = columns[0].size
+        width = len(str(max(n_rows - 1, 0)))
+
+        def work(job):
+            ids = []
+            for start, stop in iter_chunks(n_rows, chunk_size):
+                job.check_cancelled()
+                shard = [c[start:stop] for c in columns]
+                pop = QEnzyme.simulate_batch(
+                    *shard, times=times, precision=precision
+                )
+                ids += self.library.append_many(
+                    [f"{prefix}-{i:0{width}d}" for i in range(start, stop)],
+                    dict(zip(PARAMETERS, shard)),
+                    times,
+                    pop,
+                    exact_speed=True,
+                )
+                job.completed = stop
+                job.result = ids
+            return ids
+
+        label = f"Scan '{prefix}' ({n_rows} candidates)"
+        return self.submit("scan", label, n_rows, work)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        """All tracked jobs, newest first."""
+
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda j: j.id, reverse=True)
+
+    def active(self):
+        return [job for job in self.jobs() if not job.done]
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+
+    def clear_finished(self):
+        with self._lock:
+            for job_id in [i for i, j in self._jobs.items() if j.done]:
+                del self._jobs[job_id]
+
+    def _prune(self):
+        finished = sorted(
+            (j for j in self._jobs.values() if j.done), key=lambda j: j.id
+        )
+        for job in finished[: max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del self._jobs[job.id]
+
+    def shutdown(self, cancel=True):
+        if cancel:
+            for job in self.active():
+                job.cancel()
+        self._pool.shutdown(wait=True, cancel_futures=cancel)
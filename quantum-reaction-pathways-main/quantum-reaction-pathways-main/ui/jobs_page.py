@@ -0,0 +1,99 @@
+import streamlit as st
+
+from hamiltonians.qenzyme import PARAMETER_BOUNDS
+from simulator.batch import PRECISIONS
+from simulator.sweep import sample_design
+from ui.jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING
+from ui.state import get_job_manager
+
+POLL_SECONDS = 1.0
+
+STATUS_ICONS = {
+    QUEUED: "🕒",
+    RUNNING: "⚙️",
+    DONE: "✅",
+    CANCELLED: "⛔",
+    FAILED: "❌",
+}
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def jobs_panel():
+    """Live job list; polls without rerunning the rest of the page."""
+
+    manager = get_job_manager()
+    jobs = manager.jobs()
+    if not jobs:
+        st.info("No jobs yet. Submit a scan above or simulate on the Generate tab.")
+        return
+
+    for job in jobs:
+        col_label, col_progress, col_action = st.columns([3, 4, 1])
+        with col_label:
+            st.markdown(f"{STATUS_ICONS[job.status]} **#{job.id}** {job.label}")
+        with col_progress:
+            st.progress(
+                job.progress(),
+                text=(
+                    f"{job.completed}/{job.total} candidates · "
+                    f"{job.status} · {job.elapsed():.1f} s"
+                ),
+            )
+            if job.error:
+                st.caption(job.error)
+        with col_action:
+            if not job.done and st.button("Cancel", key=f"cancel_job_{job.id}"):
+                job.cancel()
+
+    if any(job.done for job in jobs) and st.button("Clear finished jobs"):
+        manager.clear_finished()
+        st.rerun()
+
+
+def jobs_page():
+
+    st.header("⏳ Background Jobs")
+    st.caption(
+        "Parameter scans run in the background and store every candidate "
+        "in the library as it finishes; the page stays responsive and "
+        "jobs survive reruns."
+    )
+
+    st.markdown("---")
+
+    with st.expander("🧭 New parameter scan", expanded=True):
+        col1, col2 = st.columns(2)
+
+        with col1:
+            prefix = st.text_input("Name prefix", value="Scan")
+            n_samples = st.number_input(
+                "Candidates", min_value=1, max_value=1_000_000, value=500, step=100
+            )
+            method = st.selectbox("Sampling", ["lhs", "sobol", "uniform"])
+
+        with col2:
+            seed = st.number_input("Seed", min_value=0, value=0, step=1)
+            precision = st.selectbox(
+                "Precision",
+                list(PRECISIONS),
+                help="Single precision is faster and spot-checked against double.",
+            )
+            st.caption(
+                "Parameters are sampled inside the slider ranges: "
+                + ", ".join(
+                    f"{name} {low}–{high}"
+                    for name, (low, high) in PARAMETER_BOUNDS.items()
+                )
+            )
+
+        if st.button("Submit scan", type="primary"):
+            if not prefix.strip():
+                st.warning("Please provide a name prefix.")
+            else:
+                design = sample_design(int(n_samples), seed=int(seed), method=method)
+                get_job_manager().submit_scan(
+                    design, prefix.strip(), precision=precision
+                )
+
+    st.markdown("### Jobs")
+    jobs_panel()
@@ -1,7 +1,48 @@
 import streamlit as st
-import numpy as np
 import matplotlib.pyplot as plt
 
+from ui.cache import get_figure_cache, show_figure
+from ui.state import get_library
+
+PAGE_SIZE = 20
+
+
+def pathway_figure(library, candidate):
+    times = library.times(candidate["grid_id"])
+    pop = library.trajectory(candidate)
+
+    fig, ax = plt.subplots(figsize=(7.5, 4.5))
+
+    labels = [
+        "Reactant |0⟩",
+        "Transition (left) |1⟩",
+        "Transition (right) |2⟩",
+        "Product |3⟩"
+    ]
+
+    # Product-only candidates store just the last site.
+    for i in range(4 - pop.shape[1], 4):
+        ax.plot(times, pop[:, i - 4], label=labels[i])
+
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Population")
+    ax.set_title("Quantum Reaction Pathway")
+    ax.legend()
+    ax.grid(alpha=0.25)
+    return fig
+
+
+def product_figure(library, candidate):
+    times = library.times(candidate["grid_id"])
+    pop = library.trajectory(candidate)
+
+    fig, ax = plt.subplots(figsize=(7.5, 1.8))
+    ax.plot(times, pop[:, -1])
+    ax.set_ylabel("Population")
+    ax.set_xlabel("Time")
+    ax.grid(alpha=0.25)
+    return fig
+
 
 def library_page():
    
@@ -13,66 +54,66 @@ def library_page():
 
     st.markdown("---")
     
-    if not st.session_state.candidates:
+    library = get_library()
+    n_candidates = len(library)
+
+    if not n_candidates:
         st.info(
             "No candidates stored yet. "
             "Generate and store at least one candidate to view it here."
         )
         return
-    for idx, candidate in enumerate(list(st.session_state.candidates)):
+
+    n_pages = (n_candidates - 1) // PAGE_SIZE + 1
+    page = st.number_input(
+        f"Page (of {n_pages})",
+        min_value=1,
+        max_value=n_pages,
+        value=1,
+        step=1,
+    )
+
+    for idx, candidate in enumerate(
+        library.rows(offset=(page - 1) * PAGE_SIZE, limit=PAGE_SIZE),
+        start=(page - 1) * PAGE_SIZE,
+    ):
         name = candidate["name"]
-        params = candidate["params"]
-        times = candidate["times"]
-        pop = candidate["pop"]
-        
-        final_product = pop[-1, 3]
-        max_product = np.max(pop[:, 3])
-        variance_product = np.var(pop[:, 3])
 
         with st.expander(f"{idx + 1}. {name}", expanded=False):
             
             st.markdown("**Hamiltonian parameters**")
 
             col_p1, col_p2, col_p3, col_p4 = st.columns(4)
-            col_p1.metric("Tunneling", f"{params[0]:.2f}")
-            col_p2.metric("Product bias", f"{params[1]:.2f}")
-            col_p3.metric("TS stabilization", f"{params[2]:.2f}")
-            col_p4.metric("Environment", f"{params[3]:.2f}")
+            col_p1.metric("Tunneling", f"{candidate['tunneling']:.2f}")
+            col_p2.metric("Product bias", f"{candidate['product_bias']:.2f}")
+            col_p3.metric("TS stabilization", f"{candidate['ts_stabilization']:.2f}")
+            col_p4.metric("Environment", f"{candidate['environment']:.2f}")
+
+            col_m1, col_m2, col_m3 = st.columns(3)
+            col_m1.metric("Final yield", f"{candidate['final_yield']:.3f}")
+            col_m2.metric("Max yield", f"{candidate['max_yield']:.3f}")
+            col_m3.metric("Variance", f"{-candidate['stability']:.4f}")
 
             st.markdown("")
-            
-            fig, ax = plt.subplots(figsize=(7.5, 4.5))
-
-            labels = [
-                "Reactant |0⟩",
-                "Transition (left) |1⟩",
-                "Transition (right) |2⟩",
-                "Product |3⟩"
-            ]
-
-            for i in range(4):
-                ax.plot(times, pop[:, i], label=labels[i])
-
-            ax.set_xlabel("Time")
-            ax.set_ylabel("Population")
-            ax.set_title("Quantum Reaction Pathway")
-            ax.legend()
-            ax.grid(alpha=0.25)
-
-            st.pyplot(fig, use_container_width=True)
-            st.markdown("**Product state evolution (|3⟩)**")
-
-            fig2, ax2 = plt.subplots(figsize=(7.5, 1.8))
-            ax2.plot(times, pop[:, 3])
-            ax2.set_ylabel("Population")
-            ax2.set_xlabel("Time")
-            ax2.grid(alpha=0.25)
-
-            st.pyplot(fig2, use_container_width=True)
-            
+
+            if st.toggle("Show dynamics", key=f"show_{candidate['id']}"):
+                key = (candidate["id"],)
+
+                show_figure(
+                    ("pathway", key),
+                    lambda: pathway_figure(library, candidate),
+                )
+                st.markdown("**Product state evolution (|3⟩)**")
+
+                show_figure(
+                    ("product", key),
+                    lambda: product_figure(library, candidate),
+                )
+
             if st.button(
                 f"Remove candidate: {name}",
-                key=f"delete_{idx}"
+                key=f"delete_{candidate['id']}"
             ):
-                st.session_state.candidates.pop(idx)
+                library.delete(candidate["id"])
+                get_figure_cache().invalidate(candidate["id"])
                 st.rerun()
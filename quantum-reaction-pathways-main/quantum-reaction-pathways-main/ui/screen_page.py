@@ -1,8 +1,46 @@
 import streamlit as st
-import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from ui.cache import library_ranking, show_figure
+from ui.state import get_library
+
+MAX_TABLE_ROWS = 1000
+MAX_PLOTTED = 10
+
+SCREEN_METRICS = {
+    "Final product yield": "final_yield",
+    "Reaction speed": "speed",
+    "Selectivity": "selectivity",
+    "Dynamical stability": "stability",
+    "Composite score": "composite",
+}
+
+
+def comparison_figure(library, candidate_ids, best):
+    fig, ax = plt.subplots(figsize=(8.5, 5))
+
+    for candidate_id in candidate_ids:
+        candidate = library.get(candidate_id)
+        name = candidate["name"]
+        pop = library.trajectory(candidate)
+        times = library.times(candidate["grid_id"])
+
+        ax.plot(
+            times,
+            pop[:, -1],
+            label=name,
+            linewidth=2 if name == best else 1.2,
+            alpha=0.95 if name == best else 0.6
+        )
+
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Product population |3⟩")
+    ax.set_title("Emergent Reaction Pathways under Different Hamiltonians")
+    ax.legend()
+    ax.grid(alpha=0.25)
+    return fig
+
 
 def screen_page():
     st.header("📊 Screen & Rank Candidates")
@@ -12,7 +50,8 @@ def screen_page():
     )
 
     st.markdown("---")
-    if len(st.session_state.candidates) < 2:
+    library = get_library()
+    if len(library) < 2:
         st.info(
             "At least **two stored candidates** are required to perform screening. "
             "Generate and store additional candidates to proceed."
@@ -22,13 +61,7 @@ def screen_page():
 
     metric = st.selectbox(
         "Efficiency criterion",
-        [
-            "Final product yield",
-            "Reaction speed",
-            "Selectivity",
-            "Dynamical stability",
-            "Composite score"
-        ]
+        list(SCREEN_METRICS)
     )
     with st.expander("ℹ️ What does this metric mean?", expanded=True):
 
@@ -64,60 +97,23 @@ def screen_page():
             )
 
     st.markdown("")
-    scores = []
-
-    for candidate in st.session_state.candidates:
-        name = candidate["name"]
-        pop = candidate["pop"]
-        times = candidate["times"]
-
-        final_product = pop[-1, 3]
-        variance_product = np.var(pop[:, 3])
-        threshold = 0.4
-        try:
-            speed_index = next(
-                i for i, p in enumerate(pop[:, 3]) if p >= threshold
-            )
-            speed_score = -times[speed_index]
-        except StopIteration:
-            speed_score = -np.inf
-
-        if metric == "Final product yield":
-            score = final_product
-
-        elif metric == "Reaction speed":
-            score = speed_score
-
-        elif metric == "Selectivity":
-            score = final_product / (np.sum(pop[-1, :3]) + 1e-9)
-
-        elif metric == "Dynamical stability":
-            score = -variance_product
-
-        else:
-            score = (
-                final_product
-                + speed_score * 0.3
-                - variance_product * 0.2
-            )
-
-        scores.append({
-            "Candidate": name,
-            "Score": score,
-            "Final yield": final_product,
-            "Stability": variance_product
-        })
+    columns, order = library_ranking(
+        library, library.revision(), SCREEN_METRICS[metric]
+    )
 
-    df = pd.DataFrame(scores).sort_values(
-        by="Score", ascending=False
-    ).reset_index(drop=True)
+    df = pd.DataFrame({
+        "Candidate": columns["name"][order],
+        "Score": columns[SCREEN_METRICS[metric]][order],
+        "Final yield": columns["final_yield"][order],
+        "Stability": -columns["stability"][order],
+    })
 
     best = df.iloc[0]["Candidate"]
     worst = df.iloc[-1]["Candidate"]
     st.subheader("🏆 Ranking Results")
 
     st.dataframe(
-        df,
+        df.head(MAX_TABLE_ROWS),
         use_container_width=True,
         hide_index=True
     )
@@ -131,29 +127,14 @@ def screen_page():
 
     st.markdown("---")
     st.subheader("📈 Product Population Comparison")
+    if len(order) > MAX_PLOTTED:
+        st.caption(f"Showing the top {MAX_PLOTTED} candidates.")
 
-    fig, ax = plt.subplots(figsize=(8.5, 5))
-
-    for candidate in st.session_state.candidates:
-        name = candidate["name"]
-        pop = candidate["pop"]
-        times = candidate["times"]
-
-        ax.plot(
-            times,
-            pop[:, 3],
-            label=name,
-            linewidth=2 if name == best else 1.2,
-            alpha=0.95 if name == best else 0.6
-        )
-
-    ax.set_xlabel("Time")
-    ax.set_ylabel("Product population |3⟩")
-    ax.set_title("Emergent Reaction Pathways under Different Hamiltonians")
-    ax.legend()
-    ax.grid(alpha=0.25)
-
-    st.pyplot(fig, use_container_width=True)
+    top_ids = tuple(int(i) for i in columns["id"][order[:MAX_PLOTTED]])
+    show_figure(
+        ("screen", top_ids, SCREEN_METRICS[metric]),
+        lambda: comparison_figure(library, top_ids, best),
+    )
     st.markdown("### 🧠 Interpretation")
 
     st.write(
@@ -0,0 +1,14 @@
+import streamlit as st
+
+from storage.candidate_library import CandidateLibrary
+from ui.jobs import JobManager
+
+
+@st.cache_resource
+def get_library():
+    return CandidateLibrary()
+
+
+@st.cache_resource
+def get_job_manager():
+    return JobManager(get_library())